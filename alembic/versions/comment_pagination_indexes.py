@@ -0,0 +1,32 @@
+"""índices compuestos para paginar comentarios de primer nivel y respuestas por cursor
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "d0e1f2a3b4c5"
+down_revision: Union[str, Sequence[str], None] = "c9d0e1f2a3b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_INDEXES = [
+    ("ix_insult_comments_insult_id_parent_id_created_at_id", ["insult_id", "parent_id", "created_at", "id"]),
+    ("ix_insult_comments_parent_id_created_at_id", ["parent_id", "created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    for name, columns in _INDEXES:
+        op.create_index(name, "insult_comments", columns)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(_INDEXES):
+        op.drop_index(name, table_name="insult_comments")
@@ -0,0 +1,35 @@
+"""journal counter_deltas para el modo write-behind de estrellitas y likes
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "e1f2a3b4c5d6"
+down_revision: Union[str, Sequence[str], None] = "d0e1f2a3b4c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "counter_deltas",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("counter", sa.String(50), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.Column("delta", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_counter_deltas_counter_row_id", "counter_deltas", ["counter", "row_id"])
+
+
+def downgrade() -> None:
+    # Los deltas pendientes se pierden: desactiva COUNTER_WRITE_BEHIND y ejecuta
+    # `python counters.py` antes de bajar de versión.
+    op.drop_index("ix_counter_deltas_counter_row_id", table_name="counter_deltas")
+    op.drop_table("counter_deltas")
@@ -0,0 +1,61 @@
+"""contadores desnormalizados de estrellitas, comentarios y likes
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "e5f6a7b8c9d0"
+down_revision: Union[str, Sequence[str], None] = "d4e5f6a7b8c9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("insults", sa.Column("star_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("insults", sa.Column("comments_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("insult_comments", sa.Column("star_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("insult_comments", sa.Column("likes_count", sa.Integer(), nullable=False, server_default="0"))
+
+    # Backfill desde las tablas de votos/comentarios
+    op.execute(
+        """
+        UPDATE insults SET star_count = s.n
+        FROM (SELECT insult_id, count(*) AS n FROM insult_stars GROUP BY insult_id) s
+        WHERE s.insult_id = insults.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE insults SET comments_count = c.n
+        FROM (SELECT insult_id, count(*) AS n FROM insult_comments GROUP BY insult_id) c
+        WHERE c.insult_id = insults.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE insult_comments SET star_count = s.n
+        FROM (SELECT comment_id, count(*) AS n FROM comment_stars GROUP BY comment_id) s
+        WHERE s.comment_id = insult_comments.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE insult_comments SET likes_count = l.n
+        FROM (SELECT comment_id, count(*) AS n FROM comment_likes GROUP BY comment_id) l
+        WHERE l.comment_id = insult_comments.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("insult_comments", "likes_count")
+    op.drop_column("insult_comments", "star_count")
+    op.drop_column("insults", "comments_count")
+    op.drop_column("insults", "star_count")
@@ -0,0 +1,53 @@
+"""búsqueda de texto completo: configuración spanish_unaccent y columnas search_vector con GIN
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "b8c9d0e1f2a3"
+down_revision: Union[str, Sequence[str], None] = "a7b8c9d0e1f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tabla -> expresión del tsvector (copia de text_search.SEARCH_VECTORS)
+_VECTORS = {
+    "words": (
+        "setweight(to_tsvector('spanish_unaccent'::regconfig, coalesce(word, '')), 'A') || "
+        "setweight(to_tsvector('spanish_unaccent'::regconfig, coalesce(meaning, '')), 'B')"
+    ),
+    "insults": (
+        "setweight(to_tsvector('spanish_unaccent'::regconfig, coalesce(insult, '')), 'A') || "
+        "setweight(to_tsvector('spanish_unaccent'::regconfig, coalesce(meaning, '')), 'B')"
+    ),
+    "word_examples": "to_tsvector('spanish_unaccent'::regconfig, coalesce(text, ''))",
+    "insult_examples": "to_tsvector('spanish_unaccent'::regconfig, coalesce(text, ''))",
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("CREATE TEXT SEARCH CONFIGURATION spanish_unaccent (COPY = spanish)")
+    op.execute(
+        "ALTER TEXT SEARCH CONFIGURATION spanish_unaccent "
+        "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem"
+    )
+    for table, expression in _VECTORS.items():
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({expression}) STORED"
+        )
+        op.execute(f"CREATE INDEX ix_{table}_search_vector ON {table} USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    for table in _VECTORS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS spanish_unaccent")
@@ -0,0 +1,35 @@
+"""índices compuestos para paginar GET /bad_words/ por cursor
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "f6a7b8c9d0e1"
+down_revision: Union[str, Sequence[str], None] = "e5f6a7b8c9d0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_INDEXES = [
+    ("ix_insults_star_count_id", ["star_count", "id"]),
+    ("ix_insults_comments_count_id", ["comments_count", "id"]),
+    ("ix_insults_tag_id_insult", ["tag_id", "insult"]),
+    ("ix_insults_tag_id_star_count_id", ["tag_id", "star_count", "id"]),
+    ("ix_insults_tag_id_comments_count_id", ["tag_id", "comments_count", "id"]),
+]
+
+
+def upgrade() -> None:
+    for name, columns in _INDEXES:
+        op.create_index(name, "insults", columns)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(_INDEXES):
+        op.drop_index(name, table_name="insults")
@@ -0,0 +1,64 @@
+"""claves normalizadas (sin tildes ni mayúsculas) con índice único en palabras, insultos, tags y categorías
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-17
+
+"""
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c9d0e1f2a3b4"
+down_revision: Union[str, Sequence[str], None] = "b8c9d0e1f2a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tabla -> (columna de origen, columna clave, longitud de la clave)
+_KEYS = {
+    "words": ("word", "word_key", 200),
+    "insults": ("insult", "insult_key", 200),
+    "insult_tags": ("name", "name_key", 160),
+    "categories": ("name", "name_key", 200),
+}
+
+
+def _fold(text: str) -> str:
+    # Copia de normalize.fold: la migración no depende del código de la app.
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for table, (source, key, length) in _KEYS.items():
+        op.add_column(table, sa.Column(key, sa.String(length), nullable=True))
+
+        rows = conn.execute(sa.text(f"SELECT id, {source} FROM {table}")).all()
+        by_key = {}
+        for row_id, value in rows:
+            by_key.setdefault(_fold(value), []).append((row_id, value))
+        clashes = [group for group in by_key.values() if len(group) > 1]
+        if clashes:
+            # No se elige un ganador a ciegas: hay que fusionar o renombrar a mano y repetir.
+            detail = "; ".join(", ".join(f"{row_id}={value!r}" for row_id, value in group) for group in clashes)
+            raise RuntimeError(f"{table}.{source}: valores que solo difieren en tildes/mayúsculas: {detail}")
+
+        if rows:
+            conn.execute(
+                sa.text(f"UPDATE {table} SET {key} = :key WHERE id = :id"),
+                [{"id": row_id, "key": _fold(value)} for row_id, value in rows],
+            )
+        op.alter_column(table, key, nullable=False)
+        op.create_index(f"ix_{table}_{key}", table, [key], unique=True)
+
+
+def downgrade() -> None:
+    for table, (_, key, _) in _KEYS.items():
+        op.drop_index(f"ix_{table}_{key}", table_name=table)
+        op.drop_column(table, key)
@@ -0,0 +1,102 @@
+"""versiones de cambio (sync_version) y tombstones para GET /sync
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "a7b8c9d0e1f2"
+down_revision: Union[str, Sequence[str], None] = "f6a7b8c9d0e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tabla -> columnas cuyo cambio sube la versión (copia de sync_versions.SYNC_TABLES)
+_TABLES = {
+    "categories": ["name"],
+    "words": ["word", "meaning", "is_active"],
+    "word_examples": ["word_id", "text", "is_active"],
+    "insult_tags": ["name"],
+    "insults": ["insult", "meaning", "is_active", "tag_id"],
+    "insult_examples": ["insult_id", "text", "is_active"],
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_tombstones",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("table_name", sa.String(50), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.Column("sync_version", sa.BigInteger(), nullable=False),
+    )
+    op.create_index("ix_sync_tombstones_sync_version", "sync_tombstones", ["sync_version"])
+
+    for table in _TABLES:
+        op.add_column(table, sa.Column("sync_version", sa.BigInteger(), nullable=True))
+        # Las filas existentes entran con la versión de esta migración
+        op.execute(f"UPDATE {table} SET sync_version = txid_current()")
+        op.create_index(f"ix_{table}_sync_version", table, ["sync_version"])
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION sync_touch() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.sync_version := txid_current();
+            RETURN NEW;
+        END $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION sync_tombstone() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO sync_tombstones (table_name, row_id, sync_version)
+            VALUES (TG_TABLE_NAME, OLD.id, txid_current());
+            RETURN OLD;
+        END $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION sync_touch_word_category() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE words SET sync_version = txid_current()
+            WHERE id = CASE WHEN TG_OP = 'DELETE' THEN OLD.word_id ELSE NEW.word_id END;
+            RETURN NULL;
+        END $$
+        """
+    )
+    for table, columns in _TABLES.items():
+        op.execute(
+            f"CREATE TRIGGER {table}_sync_touch BEFORE INSERT OR UPDATE OF {', '.join(columns)} "
+            f"ON {table} FOR EACH ROW EXECUTE FUNCTION sync_touch()"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_sync_tombstone AFTER DELETE "
+            f"ON {table} FOR EACH ROW EXECUTE FUNCTION sync_tombstone()"
+        )
+    op.execute(
+        "CREATE TRIGGER word_category_sync_touch AFTER INSERT OR DELETE "
+        "ON word_category FOR EACH ROW EXECUTE FUNCTION sync_touch_word_category()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS word_category_sync_touch ON word_category")
+    for table in _TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_tombstone ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_touch ON {table}")
+        op.drop_index(f"ix_{table}_sync_version", table_name=table)
+        op.drop_column(table, "sync_version")
+    op.execute("DROP FUNCTION IF EXISTS sync_touch_word_category()")
+    op.execute("DROP FUNCTION IF EXISTS sync_tombstone()")
+    op.execute("DROP FUNCTION IF EXISTS sync_touch()")
+    op.drop_index("ix_sync_tombstones_sync_version", table_name="sync_tombstones")
+    op.drop_table("sync_tombstones")
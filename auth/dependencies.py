@@ -1,29 +1,33 @@
-from fastapi import HTTPException, Depends
+from fastapi import HTTPException, Depends, Request
 from fastapi.security import HTTPBearer
+from functools import lru_cache
 from typing import Optional
-import os
 import jwt
-from jwt import PyJWKClient
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from config import settings
 from database import get_db
+from auth.jwks import JWKSKeyStore
+from auth.known_users import KnownUsers
+from auth.token_cache import VerifiedTokenCache
+from auth.verify_pool import VerificationPool
 from schemas.user import TokenPayload
 import models
 
-# En macOS, Python a veces no encuentra los certificados SSL; certifi los proporciona.
-try:
-    import certifi
-    os.environ.setdefault("SSL_CERT_FILE", certifi.where())
-except ImportError:
-    pass
-
 security = HTTPBearer(auto_error=False)
 
-# JWKS de Supabase para verificar tokens ES256 (clave asimétrica)
-def _get_jwks_client() -> PyJWKClient:
+# JWKS de Supabase para verificar tokens ES256 (clave asimétrica).
+# Un único almacén por proceso: las claves se reutilizan entre peticiones.
+@lru_cache()
+def _get_jwks_client() -> JWKSKeyStore:
     jwks_url = f"{settings.supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json"
-    return PyJWKClient(jwks_url)
+    return JWKSKeyStore(
+        jwks_url,
+        ttl=settings.jwks_cache_ttl,
+        min_refetch_interval=settings.jwks_min_refetch_interval,
+        fetch_timeout=settings.jwks_fetch_timeout,
+    )
 
 
 def _decode_supabase_token(token_str: str):
@@ -50,7 +54,46 @@ def _decode_supabase_token(token_str: str):
     raise jwt.InvalidTokenError(f"Algoritmo no permitido: {alg}")
 
 
-async def get_current_user(token: Optional[str] = Depends(security)) -> Optional[TokenPayload]:
+# Tokens ya verificados: los clientes reenvían el mismo bearer cientos de veces.
+token_cache = VerifiedTokenCache(
+    max_entries=settings.token_cache_max_entries,
+    max_bytes=settings.token_cache_max_bytes,
+)
+
+
+def _path_label(request: Request) -> str:
+    """Primer segmento de la ruta (/bad_words, /words...) para los contadores de la caché."""
+    return "/" + request.url.path.strip("/").split("/", 1)[0]
+
+
+# Verificación fuera del event loop: la descarga del JWKS es I/O bloqueante y la firma es CPU.
+verify_pool = VerificationPool(
+    max_workers=settings.auth_verify_workers,
+    timeout=settings.auth_verify_timeout,
+)
+
+
+async def _verify_token(token_str: str, path: str = "") -> TokenPayload:
+    """Devuelve el payload verificado, desde la caché si el token ya se verificó antes."""
+    cached = token_cache.get(token_str, path)
+    if cached is not None:
+        return cached
+    if settings.auth_verify_mode == "inline":
+        claims = _decode_supabase_token(token_str)
+    else:
+        try:
+            claims = await verify_pool.run(_decode_supabase_token, token_str)
+        except TimeoutError:
+            raise HTTPException(status_code=503, detail="Token verification timed out")
+    payload = TokenPayload(**claims)
+    token_cache.put(token_str, payload)
+    return payload
+
+
+async def get_current_user(
+    request: Request,
+    token: Optional[str] = Depends(security),
+) -> Optional[TokenPayload]:
     """
     Verificar token JWT de Supabase (opcional)
     """
@@ -58,8 +101,9 @@ async def get_current_user(token: Optional[str] = Depends(security)) -> Optional
         return None
 
     try:
-        payload = _decode_supabase_token(token.credentials)
-        return TokenPayload(**payload)
+        return await _verify_token(token.credentials, _path_label(request))
+    except HTTPException:
+        raise
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
@@ -69,7 +113,7 @@ async def get_current_user(token: Optional[str] = Depends(security)) -> Optional
         raise HTTPException(status_code=401, detail="Token verification failed")
 
 
-async def require_auth(token: str = Depends(security)) -> TokenPayload:
+async def require_auth(request: Request, token: str = Depends(security)) -> TokenPayload:
     """
     Require authentication - lanza error si no hay token válido
     """
@@ -80,8 +124,9 @@ async def require_auth(token: str = Depends(security)) -> TokenPayload:
         raise HTTPException(status_code=401, detail="Authentication required")
 
     try:
-        payload = _decode_supabase_token(token.credentials)
-        return TokenPayload(**payload)
+        return await _verify_token(token.credentials, _path_label(request))
+    except HTTPException:
+        raise
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError as e:
@@ -92,6 +137,27 @@ async def require_auth(token: str = Depends(security)) -> TokenPayload:
         raise HTTPException(status_code=401, detail="Token verification failed")
 
 
+# Ids que ya existen en `users`: un toggle en estado estable no hace consultas de usuario.
+known_users = KnownUsers(max_entries=settings.known_users_max_entries)
+
+
+def upsert_user(db: Session, current_user: TokenPayload) -> None:
+    """
+    Asegura que el usuario del token exista en `users`.
+    Si ya lo hemos visto no toca la BD; si no, un único INSERT ... ON CONFLICT DO NOTHING.
+    """
+    if current_user.sub in known_users:
+        return
+    stmt = (
+        pg_insert(models.User)
+        .values(id=current_user.sub, email=current_user.email, full_name=None, avatar_url=None)
+        .on_conflict_do_nothing(index_elements=[models.User.id])
+    )
+    db.execute(stmt)
+    db.commit()
+    known_users.add(current_user.sub)
+
+
 def ensure_user_in_db(
     current_user: TokenPayload = Depends(require_auth),
     db: Session = Depends(get_db),
@@ -100,14 +166,5 @@ def ensure_user_in_db(
     Requiere autenticación y asegura que el usuario exista en la tabla users
     (upsert por id). Usar en rutas que escriben user_id en tablas con FK a users.
     """
-    user = db.query(models.User).filter(models.User.id == current_user.sub).first()
-    if not user:
-        user = models.User(
-            id=current_user.sub,
-            email=current_user.email,
-            full_name=None,
-            avatar_url=None,
-        )
-        db.add(user)
-        db.commit()
-    return current_user
\ No newline at end of file
+    upsert_user(db, current_user)
+    return current_user
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import jwt
+from jwt import PyJWK, PyJWKClient, PyJWKSet
+from jwt.exceptions import PyJWKClientError
+
+
+def _ensure_ca_bundle() -> None:
+    # En macOS, Python a veces no encuentra los certificados SSL; certifi los proporciona.
+    # Se hace en la primera descarga para no pagar el import de certifi en el arranque.
+    try:
+        import certifi
+        os.environ.setdefault("SSL_CERT_FILE", certifi.where())
+    except ImportError:
+        pass
+
+
+class JWKSKeyStore:
+    """
+    Almacén de claves JWKS compartido por todo el proceso.
+
+    - Las claves se refrescan en segundo plano cada `ttl` segundos.
+    - Si llega un `kid` desconocido (rotación de claves) se vuelve a descargar el JWKS,
+      pero como mucho una vez cada `min_refetch_interval` segundos.
+    - Las descargas son single-flight: si muchas peticiones necesitan refrescar a la vez,
+      solo una va a Supabase y el resto espera su resultado.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        ttl: float = 600,
+        min_refetch_interval: float = 30,
+        fetch_timeout: float = 5,
+    ):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.min_refetch_interval = min_refetch_interval
+        # Sin caché propia de PyJWKClient: la caché es este almacén.
+        self._client = PyJWKClient(jwks_url, cache_jwk_set=False, cache_keys=False, timeout=fetch_timeout)
+        self._keys: Dict[str, PyJWK] = {}
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._refresh_lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.fetch_count = 0
+        self.fetch_errors = 0
+
+    # ----- Lectura -----
+    def get_signing_key_from_jwt(self, token: str) -> PyJWK:
+        header = jwt.get_unverified_header(token)
+        return self.get_signing_key(header.get("kid"))
+
+    def get_signing_key(self, kid: Optional[str]) -> PyJWK:
+        self._ensure_refresher()
+        key = self._keys.get(kid)
+        if key is not None and not self._is_stale():
+            return key
+        self._refresh(kid=kid)
+        key = self._keys.get(kid)
+        if key is None:
+            raise PyJWKClientError(f'No se encontró la clave "{kid}" en el JWKS')
+        return key
+
+    def _is_stale(self) -> bool:
+        # Solo pasa si el refresco en segundo plano lleva varios ciclos fallando.
+        return time.monotonic() - self._fetched_at > self.ttl * 3
+
+    # ----- Descarga -----
+    def _refresh(self, kid: Optional[str] = None, force: bool = False) -> None:
+        with self._refresh_lock:
+            now = time.monotonic()
+            if not force:
+                # Otra petición refrescó mientras esperábamos el lock.
+                if kid in self._keys and not self._is_stale():
+                    return
+                # Evita martillar Supabase con tokens de `kid` inventado.
+                if self._keys and now - self._last_attempt < self.min_refetch_interval:
+                    return
+            self._last_attempt = now
+            _ensure_ca_bundle()
+            try:
+                jwk_set = PyJWKSet.from_dict(self._client.fetch_data())
+            except Exception as e:
+                self.fetch_errors += 1
+                print(f"[jwks] Error al descargar {self.jwks_url}: {e}")
+                if not self._keys:
+                    raise
+                return
+            self._keys = {k.key_id: k for k in jwk_set.keys}
+            self._fetched_at = time.monotonic()
+            self.fetch_count += 1
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is not None:
+            return
+        with self._refresh_lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_loop, name="jwks-refresh", daemon=True)
+                self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.ttl):
+            try:
+                self._refresh(force=True)
+            except Exception:
+                pass
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._keys),
+            "fetch_count": self.fetch_count,
+            "fetch_errors": self.fetch_errors,
+            "age_seconds": round(time.monotonic() - self._fetched_at, 1) if self._fetched_at else None,
+        }
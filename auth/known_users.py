@@ -0,0 +1,35 @@
+import threading
+from collections import OrderedDict
+
+
+class KnownUsers:
+    """
+    Conjunto LRU acotado de ids de usuario que ya sabemos que existen en `users`.
+
+    Los usuarios nunca se borran desde la API, así que una vez vistos no hace falta
+    volver a comprobarlos en cada escritura.
+    """
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._ids: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, user_id: str) -> bool:
+        with self._lock:
+            if user_id not in self._ids:
+                return False
+            self._ids.move_to_end(user_id)
+            return True
+
+    def add(self, user_id: str) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._ids[user_id] = None
+            self._ids.move_to_end(user_id)
+            while len(self._ids) > self.max_entries:
+                self._ids.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._ids)
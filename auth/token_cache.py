@@ -0,0 +1,95 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from schemas.user import TokenPayload
+
+# Tamaño aproximado de una entrada sin contar los strings del payload
+# (clave sha256, tupla, modelo pydantic y nodo del OrderedDict).
+_ENTRY_OVERHEAD = 400
+
+
+class VerifiedTokenCache:
+    """
+    Caché LRU de tokens ya verificados, indexada por el sha256 del token.
+
+    Cada entrada caduca en el `exp` del propio token, así que un token expirado
+    nunca sale de la caché: se vuelve a verificar y falla como siempre.
+    El tamaño está acotado por número de entradas y por bytes aproximados.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[bytes, Tuple[TokenPayload, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._by_path: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    @staticmethod
+    def _size(payload: TokenPayload) -> int:
+        return _ENTRY_OVERHEAD + len(payload.sub) + len(payload.email)
+
+    def get(self, token: str, path: str = "") -> Optional[TokenPayload]:
+        if not self.enabled:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0].exp <= time.time():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._count(path, "misses")
+                return None
+            self._entries.move_to_end(key)
+            self._count(path, "hits")
+            return entry[0]
+
+    def put(self, token: str, payload: TokenPayload) -> None:
+        if not self.enabled or payload.exp <= time.time():
+            return
+        key = self._key(token)
+        size = self._size(payload)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (payload, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: bytes) -> None:
+        _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _count(self, path: str, field: str) -> None:
+        setattr(self, field, getattr(self, field) + 1)
+        if path:
+            counters = self._by_path.setdefault(path, {"hits": 0, "misses": 0})
+            counters[field] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "evictions": self.evictions,
+                "by_path": {k: dict(v) for k, v in self._by_path.items()},
+            }
@@ -0,0 +1,80 @@
+import time
+from typing import Callable, Optional, TypeVar
+
+import anyio
+
+T = TypeVar("T")
+
+
+class VerificationPool:
+    """
+    Ejecuta la verificación de tokens (descarga JWKS + firma) en hilos,
+    fuera del event loop, con su propio límite de concurrencia.
+
+    No comparte el threadpool por defecto de anyio, así que un Supabase lento
+    solo ocupa estos `max_workers` hilos y no deja sin hilos a las rutas síncronas.
+    """
+
+    def __init__(self, max_workers: int = 8, timeout: float = 10):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.errors = 0
+        self.timeouts = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+        self.max_run = 0.0
+
+    def _get_limiter(self) -> anyio.CapacityLimiter:
+        # El limiter debe crearse dentro del event loop.
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.max_workers)
+        return self._limiter
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        queued_at = time.perf_counter()
+        timing = {}
+
+        def _timed():
+            timing["start"] = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                timing["end"] = time.perf_counter()
+
+        self.in_flight += 1
+        try:
+            with anyio.fail_after(self.timeout):
+                return await anyio.to_thread.run_sync(
+                    _timed, limiter=self._get_limiter(), abandon_on_cancel=True
+                )
+        except TimeoutError:
+            self.timeouts += 1
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            if "end" in timing:
+                run = timing["end"] - timing["start"]
+                self.completed += 1
+                self._wait_total += timing["start"] - queued_at
+                self._run_total += run
+                self.max_run = max(self.max_run, run)
+
+    def stats(self) -> dict:
+        limiter = self._limiter
+        return {
+            "max_workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "waiting": limiter.statistics().tasks_waiting if limiter else 0,
+            "completed": self.completed,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self._wait_total / self.completed * 1000, 3) if self.completed else 0.0,
+            "avg_run_ms": round(self._run_total / self.completed * 1000, 3) if self.completed else 0.0,
+            "max_run_ms": round(self.max_run * 1000, 3),
+        }
@@ -0,0 +1,156 @@
+"""
+Rutas GET síncronas (threadpool + pool psycopg2) frente a async (AsyncSession + asyncpg) con
+mucha concurrencia, contra un PostgreSQL local. Ambas rutas hacen la misma consulta que
+GET /categories/{id}/words; `--db-delay` añade un pg_sleep para simular la latencia de una
+BD remota. Usa una BD desechable: crea y llena categories, words y word_category.
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_async_reads.py --concurrency 200 --requests 4000
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def build_app(db_delay: float):
+    from contextlib import asynccontextmanager
+    from typing import List
+
+    import anyio
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import select, text
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+
+    import models
+    from database import THREADPOOL_SIZE, get_db, get_read_db
+    from schemas.words import WordBase
+
+    def words_query(category_id: int):
+        return (
+            select(models.Word)
+            .join(models.word_category, models.word_category.c.word_id == models.Word.id)
+            .where(models.word_category.c.category_id == category_id)
+        )
+
+    @asynccontextmanager
+    async def lifespan(app):
+        anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+        yield
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.get("/sync/{category_id}", response_model=List[WordBase])
+    def sync_words(category_id: int, db: Session = Depends(get_db)):
+        if db_delay:
+            db.execute(text("SELECT pg_sleep(:d)"), {"d": db_delay})
+        return db.scalars(words_query(category_id)).all()
+
+    @app.get("/async/{category_id}", response_model=List[WordBase])
+    async def async_words(category_id: int, db: AsyncSession = Depends(get_read_db)):
+        if db_delay:
+            await db.execute(text("SELECT pg_sleep(:d)"), {"d": db_delay})
+        return (await db.scalars(words_query(category_id))).all()
+
+    return app
+
+
+def seed(categories: int, words_per_category: int) -> None:
+    from sqlalchemy import func, insert, select
+
+    import models
+    from database import engine
+
+    with engine.begin() as conn:
+        for table in (models.Category.__table__, models.Word.__table__, models.word_category):
+            table.create(conn, checkfirst=True)
+        if conn.scalar(select(func.count()).select_from(models.Category)):
+            return
+        conn.execute(insert(models.Category), [{"id": c, "name": f"bench{c}", "name_key": f"bench{c}"} for c in range(1, categories + 1)])
+        words = [
+            {"id": c * 1000 + i, "word": f"bench{c}_{i}", "word_key": f"bench{c}_{i}", "meaning": "m" * 80, "is_active": True}
+            for c in range(1, categories + 1)
+            for i in range(words_per_category)
+        ]
+        conn.execute(insert(models.Word), words)
+        conn.execute(insert(models.word_category), [{"word_id": w["id"], "category_id": w["id"] // 1000} for w in words])
+
+
+async def load(port: int, kind: str, concurrency: int, requests: int, categories: int):
+    import httpx
+
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i % categories + 1)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120) as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                category_id = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    r = await client.get(f"/{kind}/{category_id}")
+                    errors += r.status_code != 200
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    n = len(latencies)
+    print(
+        f"{kind:5} concurrencia={concurrency} {n} peticiones en {elapsed:.2f}s  {n / elapsed:6.0f} req/s  "
+        f"p50={latencies[n // 2] * 1000:.1f}ms  p99={latencies[int(n * 0.99)] * 1000:.1f}ms  errores={errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--db-delay", type=float, default=0.0, help="pg_sleep por petición (s)")
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--words", type=int, default=50, help="palabras por categoría")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        import uvicorn
+
+        uvicorn.run(build_app(args.db_delay), host="127.0.0.1", port=args.serve, log_level="warning")
+        return
+
+    seed(args.categories, args.words)
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", str(port), "--db-delay", str(args.db_delay)])
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        for kind in ("sync", "async"):
+            # Calentamiento: conexiones de los pools y engine async.
+            asyncio.run(load(port, kind, args.concurrency, args.concurrency, args.categories))
+        for kind in ("sync", "async", "sync", "async"):
+            asyncio.run(load(port, kind, args.concurrency, args.requests, args.categories))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
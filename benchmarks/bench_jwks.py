@@ -0,0 +1,105 @@
+"""
+Latencia de verificación de tokens ES256 contra un JWKS local con retardo de red simulado:
+un PyJWKClient nuevo por petición (como antes) frente al JWKSKeyStore compartido.
+
+    python benchmarks/bench_jwks.py --threads 16 --requests 2000 --latency 0.03
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+from jwt import PyJWKClient
+from jwt.algorithms import ECAlgorithm
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from auth.jwks import JWKSKeyStore  # noqa: E402
+
+
+def serve_jwks(jwk: dict, latency: float) -> ThreadingHTTPServer:
+    body = json.dumps({"keys": [jwk]}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def run(name, get_key, tokens, threads):
+    latencies, lock = [], threading.Lock()
+    per_thread = len(tokens) // threads
+
+    def worker(chunk):
+        local = []
+        for token in chunk:
+            started = time.perf_counter()
+            key = get_key(token)
+            jwt.decode(token, key.key, algorithms=["ES256"], audience="authenticated")
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(tokens[i * per_thread:(i + 1) * per_thread],)) for i in range(threads)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    n = len(latencies)
+    print(
+        f"{name:12} {n} verificaciones en {elapsed:.2f}s  {n / elapsed:7.0f}/s  "
+        f"p50={latencies[n // 2] * 1000:.2f}ms  p99={latencies[int(n * 0.99)] * 1000:.2f}ms  "
+        f"media={statistics.mean(latencies) * 1000:.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.03, help="retardo del JWKS en segundos")
+    args = parser.parse_args()
+
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    jwk = {**ECAlgorithm.to_jwk(private_key.public_key(), as_dict=True), "kid": "k1", "alg": "ES256", "use": "sig"}
+    httpd = serve_jwks(jwk, args.latency)
+    url = f"http://127.0.0.1:{httpd.server_port}/auth/v1/.well-known/jwks.json"
+    now = int(time.time())
+    tokens = [
+        jwt.encode(
+            {"sub": f"u{i}", "aud": "authenticated", "iat": now, "exp": now + 3600},
+            private_key,
+            algorithm="ES256",
+            headers={"kid": "k1"},
+        )
+        for i in range(args.requests)
+    ]
+
+    run("por_peticion", lambda token: PyJWKClient(url).get_signing_key_from_jwt(token), tokens, args.threads)
+    store = JWKSKeyStore(url)
+    run("compartido", store.get_signing_key_from_jwt, tokens, args.threads)
+    store.stop()
+    httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,8 +12,52 @@ class Settings(BaseSettings):
     supabase_service_key: str = os.getenv("SUPABASE_SERVICE_KEY", "")
     supabase_jwt_secret: str = os.getenv("SUPABASE_JWT_SECRET", "")
 
+    # JWKS (ES256): cada cuánto se refrescan las claves en segundo plano, timeout
+    # de la descarga y mínimo entre descargas forzadas por un `kid` desconocido.
+    jwks_cache_ttl: int = int(os.getenv("JWKS_CACHE_TTL", "600"))
+    jwks_fetch_timeout: float = float(os.getenv("JWKS_FETCH_TIMEOUT", "5"))
+    jwks_min_refetch_interval: float = float(os.getenv("JWKS_MIN_REFETCH_INTERVAL", "30"))
+
+    # Caché de tokens verificados (0 desactiva la caché).
+    token_cache_max_entries: int = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+    token_cache_max_bytes: int = int(os.getenv("TOKEN_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+    # Verificación de tokens: "thread" (pool propio de hilos, no bloquea el event loop) o "inline".
+    auth_verify_mode: str = os.getenv("AUTH_VERIFY_MODE", "thread")
+    auth_verify_workers: int = int(os.getenv("AUTH_VERIFY_WORKERS", "8"))
+    auth_verify_timeout: float = float(os.getenv("AUTH_VERIFY_TIMEOUT", "10"))
+
+    # Token para GET /metrics/ (Authorization: Bearer <token>). Sin token la ruta no se monta.
+    metrics_token: str = os.getenv("METRICS_TOKEN", "")
+
+    # Ids de usuario recordados como ya existentes en la tabla users.
+    known_users_max_entries: int = int(os.getenv("KNOWN_USERS_MAX_ENTRIES", "50000"))
+
+    # Segundos que se reutiliza el total de GET /words/ antes de volver a contar.
+    words_count_ttl: float = float(os.getenv("WORDS_COUNT_TTL", "60"))
+
+    # Segundos entre reconstrucciones del índice de autocompletado (recoge cambios de otros workers).
+    suggest_index_ttl: float = float(os.getenv("SUGGEST_INDEX_TTL", "300"))
+
+    # Modo write-behind de estrellitas y likes: el voto se guarda al momento y los contadores se
+    # actualizan por lotes cada `counter_flush_interval` segundos (solo PostgreSQL, ver counters.py).
+    counter_write_behind: bool = os.getenv("COUNTER_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+    counter_flush_interval: float = float(os.getenv("COUNTER_FLUSH_INTERVAL", "0.25"))
+
+    # Eventos en vivo por SSE (GET /bad_words/{id}/events, ver live_events.py): cola por
+    # suscriptor antes de descartar a un cliente lento, segundos entre pings y máximo de
+    # suscriptores por worker.
+    live_events: bool = os.getenv("LIVE_EVENTS", "true").lower() in ("1", "true", "yes")
+    live_events_queue_size: int = int(os.getenv("LIVE_EVENTS_QUEUE_SIZE", "100"))
+    live_events_keepalive: float = float(os.getenv("LIVE_EVENTS_KEEPALIVE", "15"))
+    live_events_max_subscribers: int = int(os.getenv("LIVE_EVENTS_MAX_SUBSCRIBERS", "1000"))
+
+    # Snapshot completo para GET /sync/snapshot: ruta del archivo y edad máxima (s) antes de regenerarlo.
+    sync_snapshot_path: str = os.getenv("SYNC_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "arrechoteca_sync_snapshot.json.gz"))
+    sync_snapshot_max_age: float = float(os.getenv("SYNC_SNAPSHOT_MAX_AGE", "3600"))
+
 @lru_cache()
 def get_settings():
     return Settings()
 
-settings = get_settings()
\ No newline at end of file
+settings = get_settings()
@@ -0,0 +1,250 @@
+"""
+Contadores desnormalizados (star_count, comments_count, likes_count).
+
+Los endpoints los mantienen en la misma transacción que cada voto o comentario. Con
+COUNTER_WRITE_BEHIND=true (solo PostgreSQL) las estrellitas y likes no tocan el contador:
+cada voto deja en la misma transacción una fila en `counter_deltas` (+1/-1), y un hilo de
+cada worker suma esas filas a los contadores cada COUNTER_FLUSH_INTERVAL segundos, con un
+UPDATE por contador. Así un insulto viral no serializa todos los votos en su fila.
+
+- El journal se guarda con el voto: si un worker muere antes de sumar, no se pierde nada.
+- Cada flush se lleva todas las filas pendientes (también las de otros workers o de antes
+  de un reinicio) y actualiza los contadores en la misma transacción.
+- Un solo worker hace flush a la vez (advisory lock); los demás lo saltan.
+
+Reconciliación: suma lo pendiente del journal y corrige cualquier deriva (ediciones manuales
+en la BD, fallos a medias, etc.). Tras desactivar el modo write-behind, ejecútala una vez:
+
+    python counters.py
+"""
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal
+
+# Contadores que admiten write-behind ("tabla.columna", como counter_deltas.counter).
+BUFFERED_COUNTERS = ("insults.star_count", "insult_comments.star_count", "insult_comments.likes_count")
+
+# Clave del advisory lock que serializa flushes y reconciliación entre workers.
+_COUNTERS_LOCK_KEY = 7_204_311
+
+
+def _pending(name: str, table: str) -> str:
+    return f"COALESCE((SELECT sum(d.delta) FROM counter_deltas d WHERE d.counter = '{name}' AND d.row_id = {table}.id), 0)"
+
+
+# (nombre, UPDATE que fija el contador al conteo real, menos lo pendiente, solo donde difiere)
+_RECONCILE_STATEMENTS = [
+    (
+        "insults.star_count",
+        f"""
+        UPDATE insults SET star_count = real.n
+        FROM (
+            SELECT i.id, count(s.insult_id) - {_pending("insults.star_count", "i")} AS n
+            FROM insults i LEFT JOIN insult_stars s ON s.insult_id = i.id
+            GROUP BY i.id
+        ) real
+        WHERE real.id = insults.id AND insults.star_count <> real.n
+        """,
+    ),
+    (
+        "insults.comments_count",
+        """
+        UPDATE insults SET comments_count = real.n
+        FROM (
+            SELECT i.id, count(c.id) AS n
+            FROM insults i LEFT JOIN insult_comments c ON c.insult_id = i.id
+            GROUP BY i.id
+        ) real
+        WHERE real.id = insults.id AND insults.comments_count <> real.n
+        """,
+    ),
+    (
+        "insult_comments.star_count",
+        f"""
+        UPDATE insult_comments SET star_count = real.n
+        FROM (
+            SELECT c.id, count(s.comment_id) - {_pending("insult_comments.star_count", "c")} AS n
+            FROM insult_comments c LEFT JOIN comment_stars s ON s.comment_id = c.id
+            GROUP BY c.id
+        ) real
+        WHERE real.id = insult_comments.id AND insult_comments.star_count <> real.n
+        """,
+    ),
+    (
+        "insult_comments.likes_count",
+        f"""
+        UPDATE insult_comments SET likes_count = real.n
+        FROM (
+            SELECT c.id, count(l.comment_id) - {_pending("insult_comments.likes_count", "c")} AS n
+            FROM insult_comments c LEFT JOIN comment_likes l ON l.comment_id = c.id
+            GROUP BY c.id
+        ) real
+        WHERE real.id = insult_comments.id AND insult_comments.likes_count <> real.n
+        """,
+    ),
+]
+
+
+# ----- Write-behind -----
+_DRAIN_SQL = text(
+    """
+    WITH flushed AS (DELETE FROM counter_deltas RETURNING counter, row_id, delta)
+    SELECT counter, row_id, sum(delta) FROM flushed
+    GROUP BY counter, row_id
+    HAVING sum(delta) <> 0
+    ORDER BY counter, row_id
+    """
+)
+
+_APPLY_SQL = """
+UPDATE {table} SET {column} = {table}.{column} + d.delta
+FROM unnest(CAST(:ids AS integer[]), CAST(:deltas AS integer[])) AS d(id, delta)
+WHERE {table}.id = d.id
+"""
+
+
+def _apply_pending(db: Session) -> int:
+    """Suma a los contadores las filas de `counter_deltas` y las borra (sin commit)."""
+    totals: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: {"ids": [], "deltas": []})
+    rows = db.execute(_DRAIN_SQL).all()
+    for name, row_id, delta in rows:
+        totals[name]["ids"].append(row_id)
+        totals[name]["deltas"].append(delta)
+    for name, params in totals.items():
+        if name not in BUFFERED_COUNTERS:
+            raise ValueError(f"Contador desconocido en counter_deltas: {name!r}")
+        table, column = name.split(".")
+        db.execute(text(_APPLY_SQL.format(table=table, column=column)), params)
+    return len(rows)
+
+
+def flush_counter_deltas(db: Session) -> Optional[int]:
+    """
+    Suma a los contadores todas las filas pendientes de `counter_deltas` y las borra, en una
+    transacción. Devuelve cuántos contadores cambiaron, o None si otro worker ya está en ello.
+    """
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _COUNTERS_LOCK_KEY}).scalar():
+        db.rollback()
+        return None
+    changed = _apply_pending(db)
+    db.commit()
+    return changed
+
+
+def reconcile_counters(db: Session) -> dict:
+    """Recalcula todos los contadores y devuelve cuántas filas se corrigieron por contador."""
+    if db.bind.dialect.name == "postgresql":
+        # Espera a que termine un flush y suma lo pendiente (también si el modo ya se desactivó).
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _COUNTERS_LOCK_KEY})
+        _apply_pending(db)
+    fixed = {}
+    for name, sql in _RECONCILE_STATEMENTS:
+        fixed[name] = db.execute(text(sql)).rowcount
+    db.commit()
+    return fixed
+
+
+class CounterBuffer:
+    """
+    Hilo de cada worker que hace flush del journal mientras haya votos recientes.
+    Los endpoints llaman a `record()` tras el commit de cada voto en modo write-behind.
+    """
+
+    def __init__(self, enabled: bool, interval: float):
+        self.enabled = enabled
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.recorded = 0
+        self._unflushed = 0  # votos de este worker desde el último flush
+        self.flushes = 0
+        self.flushed_counters = 0
+        self.skipped = 0  # otro worker tenía el lock
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.last_flush_ms: Optional[float] = None
+
+    def record(self) -> None:
+        with self._lock:
+            self.recorded += 1
+            self._unflushed += 1
+        self._ensure_flusher()
+
+    def flush(self) -> Optional[int]:
+        with self._lock:
+            seen = self._unflushed
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            changed = flush_counter_deltas(db)
+        except Exception as e:
+            db.rollback()
+            self.errors += 1
+            self.last_error = str(e)[:200]
+            return None
+        finally:
+            db.close()
+        if changed is None:
+            self.skipped += 1
+            return None
+        with self._lock:
+            self._unflushed -= seen
+        self.flushes += 1
+        self.flushed_counters += changed
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 3)
+        return changed
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="counter-flush", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        # Sigue mientras haya votos sin sumar: si otro worker tenía el lock, se reintenta.
+        while not self._stop.wait(self.interval):
+            if self._unflushed > 0:
+                self.flush()
+
+    def stop(self) -> None:
+        """Para el hilo y hace un último flush (al apagar el worker)."""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=self.interval * 4)
+            self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "interval": self.interval,
+            "recorded": self.recorded,
+            "unflushed": self._unflushed,
+            "flushes": self.flushes,
+            "flushed_counters": self.flushed_counters,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+counter_buffer = CounterBuffer(settings.counter_write_behind, settings.counter_flush_interval)
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        for name, n in reconcile_counters(db).items():
+            print(f"{name}: {n} filas corregidas")
+    finally:
+        db.close()
@@ -1,14 +1,184 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
+from functools import lru_cache
+from typing import Optional
+import anyio
+import asyncio
 import os
+import threading
+import time
 
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
-engine = create_engine(DATABASE_URL)
+
+
+def _to_async_url(url: str) -> str:
+    """postgresql://... -> postgresql+asyncpg://... (y sqlite -> aiosqlite para desarrollo)."""
+    for prefix, replacement in (
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(prefix):
+            return replacement + url[len(prefix):]
+    return url
+
+
+# Rutas GET async: por defecto la misma BD que DATABASE_URL con driver asyncpg.
+DATABASE_ASYNC_URL = os.getenv("DATABASE_ASYNC_URL") or (_to_async_url(DATABASE_URL) if DATABASE_URL else None)
+
+# Réplica de lectura opcional para las rutas GET.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", "2"))
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "5"))
+REPLICA_CHECK_TIMEOUT = float(os.getenv("REPLICA_CHECK_TIMEOUT", "1"))
+
+# ------------------------------
+# Pool de conexiones
+# ------------------------------
+# Las rutas síncronas se ejecutan en el threadpool de anyio (THREADPOOL_SIZE hilos):
+# por defecto el pool puede dar una conexión a cada hilo (pool_size + max_overflow).
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", str(max(THREADPOOL_SIZE - DB_POOL_SIZE, 0))))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# El pool async no depende del threadpool: lo comparten todas las corrutinas del worker.
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "10"))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "10"))
+
+
+class PoolMetrics:
+    """Contadores de un pool: espera en checkout, timeouts y rotación de conexiones."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def incr(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+
+class _InstrumentedPoolMixin:
+    """Mide cuánto espera cada petición para obtener una conexión del pool."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            self.metrics.incr("timeouts")
+            raise
+        finally:
+            self.metrics.record_wait(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _instrument(engine) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, record):
+        engine.pool.metrics.incr("connects")
+
+    @event.listens_for(engine, "close")
+    def _on_close(dbapi_conn, record):
+        engine.pool.metrics.incr("closes")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_conn, record, exception):
+        engine.pool.metrics.incr("invalidations")
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        engine.pool.metrics.incr("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        engine.pool.metrics.incr("checkins")
+
+
+def make_async_engine(url: str):
+    async_engine = create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=DB_ASYNC_POOL_SIZE,
+        max_overflow=DB_ASYNC_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    _instrument(async_engine.sync_engine)
+    return async_engine
+
+
+def make_engine(url: str):
+    engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    _instrument(engine)
+    return engine
+
+
+def pool_stats(engine) -> dict:
+    """Gauges y contadores del pool de un engine (para /metrics)."""
+    pool = engine.pool
+    m = pool.metrics
+    return {
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": m.checkouts,
+        "checkins": m.checkins,
+        "timeouts": m.timeouts,
+        "connects": m.connects,
+        "closes": m.closes,
+        "invalidations": m.invalidations,
+        "avg_wait_ms": round(m.wait_total / m.checkouts * 1000, 3) if m.checkouts else 0.0,
+        "max_wait_ms": round(m.wait_max * 1000, 3),
+    }
+
+
+engine = make_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -17,4 +187,133 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# ------------------------------
+# Engine asíncrono
+# ------------------------------
+# Se crea en el primer uso: los workers que no atienden GETs async no abren su pool.
+@lru_cache()
+def get_async_engine():
+    return make_async_engine(DATABASE_ASYNC_URL)
+
+
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False, class_=AsyncSession)
+
+async def get_async_db():
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
+
+
+# ------------------------------
+# Réplica de lectura
+# ------------------------------
+@lru_cache()
+def get_replica_engine():
+    return make_async_engine(_to_async_url(DATABASE_REPLICA_URL))
+
+
+# Retraso de la réplica en segundos. Si ya reprodujo todo lo recibido el retraso es 0,
+# aunque el primario lleve rato sin escrituras.
+_REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaHealth:
+    """
+    Estado de la réplica, comprobado como mucho cada `check_interval` segundos.
+    Si está caída o su retraso supera `max_lag`, las lecturas van al primario.
+
+    La comprobación corre en su propia tarea (una a la vez, con `check_timeout`): mientras
+    tanto las peticiones siguen con el último estado conocido (primario si aún no lo hay),
+    así una réplica colgada no frena ninguna lectura.
+    """
+
+    def __init__(self, check_interval: float, max_lag: float, check_timeout: float):
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self.check_timeout = check_timeout
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._checked_at = 0.0
+        self._probe_task: Optional[asyncio.Task] = None
+        self.replica_reads = 0
+        self.primary_fallbacks = 0
+
+    async def check(self) -> bool:
+        if time.monotonic() - self._checked_at >= self.check_interval and not self._probing():
+            self._probe_task = asyncio.create_task(self._probe())
+        return self.healthy
+
+    def _probing(self) -> bool:
+        # Una tarea de otro event loop (p. ej. uno ya cerrado) no cuenta.
+        task = self._probe_task
+        return task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop()
+
+    async def _probe(self) -> None:
+        try:
+            with anyio.fail_after(self.check_timeout):
+                async with get_replica_engine().connect() as conn:
+                    self.lag_seconds = float(await conn.scalar(_REPLICA_LAG_SQL) or 0)
+            self.healthy = self.lag_seconds <= self.max_lag
+            self.last_error = None if self.healthy else f"lag {self.lag_seconds:.1f}s"
+        except TimeoutError:
+            self.healthy = False
+            self.last_error = f"Sin respuesta en {self.check_timeout:g}s"
+        except Exception as e:
+            self.healthy = False
+            self.last_error = str(e)[:200]
+        self._checked_at = time.monotonic()
+
+    def mark_down(self, error: Exception) -> None:
+        self.healthy = False
+        self.last_error = str(error)[:200]
+        self._checked_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "configured": bool(DATABASE_REPLICA_URL),
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "last_error": self.last_error,
+            "replica_reads": self.replica_reads,
+            "primary_fallbacks": self.primary_fallbacks,
+        }
+
+
+replica_health = ReplicaHealth(REPLICA_CHECK_INTERVAL, REPLICA_MAX_LAG, REPLICA_CHECK_TIMEOUT)
+
+
+async def get_read_engine():
+    """Engine para lecturas: réplica si está configurada y sana, primario si no."""
+    if DATABASE_REPLICA_URL and await replica_health.check():
+        replica_health.replica_reads += 1
+        return get_replica_engine()
+    if DATABASE_REPLICA_URL:
+        replica_health.primary_fallbacks += 1
+    return get_async_engine()
+
+
+async def get_read_db():
+    """
+    Sesión async para rutas GET idempotentes: réplica si está configurada y sana,
+    primario si no. Las escrituras y las relecturas tras escribir usan get_db.
+    """
+    read_engine = await get_read_engine()
+    async with AsyncSessionLocal(bind=read_engine) as db:
+        try:
+            yield db
+        except sa_exc.OperationalError as e:
+            # Réplica caída entre comprobaciones: las siguientes peticiones irán al primario.
+            if read_engine is not get_async_engine():
+                replica_health.mark_down(e)
+            raise
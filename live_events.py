@@ -0,0 +1,221 @@
+"""
+Eventos en vivo por insulto: comentarios nuevos, editados y borrados, y cambios de contadores
+(GET /bad_words/{insult_id}/events, Server-Sent Events).
+
+- Las rutas de escritura publican con NOTIFY dentro de su transacción (`publish`): el evento
+  sale al hacer commit y se descarta si hay rollback. NOTIFY llega a todas las conexiones que
+  escuchan, así que cada worker ve también los cambios hechos en los demás.
+- Cada worker abre una sola conexión LISTEN (asyncpg, al primario) con el primer suscriptor
+  y reparte cada evento a los suscriptores de ese insulto. No sirve un pooler en modo
+  transacción (PgBouncer): LISTEN necesita una sesión propia.
+- Cada suscriptor tiene una cola acotada (LIVE_EVENTS_QUEUE_SIZE). El reparto nunca espera:
+  si un cliente lento la llena, se le descarta con un evento `reset` y se cierra su stream.
+- Si se cae la conexión LISTEN se cierran todos los streams con `reset` (pudieron perderse
+  eventos) y se reconecta. Tras `ready` o `reset` el cliente recarga los comentarios.
+
+Formato del NOTIFY (canal `insult_events`): {"insult_id": 1, "event": "...", "data": {...}}.
+
+Solo PostgreSQL.
+"""
+import asyncio
+import json
+from collections import defaultdict
+from typing import Dict, Optional, Set, Tuple
+
+import anyio
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import DB_POOL_TIMEOUT, engine, get_async_engine
+
+NOTIFY_CHANNEL = "insult_events"
+# PostgreSQL admite hasta 8000 bytes por payload.
+NOTIFY_MAX_BYTES = 7900
+RECONNECT_DELAY = 1.0
+
+
+class LiveEventsUnavailable(Exception):
+    """La conexión LISTEN no está disponible o se alcanzó el máximo de suscriptores."""
+
+
+def live_events_enabled() -> bool:
+    return settings.live_events and engine.dialect.name == "postgresql"
+
+
+# ----- Publicación -----
+def encode(insult_id: int, event: str, data: dict) -> str:
+    payload = json.dumps({"insult_id": insult_id, "event": event, "data": data}, ensure_ascii=False, separators=(",", ":"))
+    if len(payload.encode()) > NOTIFY_MAX_BYTES:
+        # Comentario muy largo: solo el id; el cliente lo recarga.
+        payload = json.dumps({"insult_id": insult_id, "event": event, "data": {"id": data.get("id"), "truncated": True}})
+    return payload
+
+
+def publish(db: Session, insult_id: int, *events: Tuple[str, dict]) -> None:
+    """Publica `events` ((nombre, datos), ...) al hacer commit la transacción de `db`, en un solo viaje."""
+    if events and live_events_enabled():
+        db.execute(select(*(func.pg_notify(NOTIFY_CHANNEL, encode(insult_id, name, data)) for name, data in events)))
+
+
+# ----- Reparto -----
+def _frame(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}\n\n"
+
+
+class Subscription:
+    def __init__(self, insult_id: int, queue_size: int):
+        self.insult_id = insult_id
+        # Frames SSE ya formateados; None cierra el stream con `reset`.
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+
+class LiveEvents:
+    def __init__(self, queue_size: int, keepalive: float, max_subscribers: int):
+        self.queue_size = queue_size
+        self.keepalive = keepalive
+        self.max_subscribers = max_subscribers
+        self._subs: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self.connections = 0
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(subs) for subs in self._subs.values())
+
+    # ----- Suscriptores -----
+    async def subscribe(self, insult_id: int) -> Subscription:
+        """Suscribe al insulto cuando la conexión LISTEN está lista (LiveEventsUnavailable si no llega a estarlo)."""
+        if self.subscribers >= self.max_subscribers:
+            raise LiveEventsUnavailable("Demasiados suscriptores en este worker")
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        try:
+            with anyio.fail_after(DB_POOL_TIMEOUT):
+                await self._ready.wait()
+        except TimeoutError:
+            raise LiveEventsUnavailable(self.last_error or "Sin conexión LISTEN")
+        sub = Subscription(insult_id, self.queue_size)
+        self._subs[insult_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subs.get(sub.insult_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subs[sub.insult_id]
+
+    def _drop(self, sub: Subscription) -> None:
+        # Se vacía su cola (libera la memoria) y se deja solo el aviso de cierre.
+        self.unsubscribe(sub)
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(None)
+
+    def _drop_all(self) -> None:
+        for subs in list(self._subs.values()):
+            for sub in list(subs):
+                self._drop(sub)
+
+    async def stream(self, sub: Subscription):
+        """Frames SSE para `sub`: `ready`, luego los eventos, y un comentario cada `keepalive` segundos."""
+        try:
+            yield "retry: 3000\n" + _frame("ready", {"insult_id": sub.insult_id})
+            while True:
+                try:
+                    with anyio.fail_after(self.keepalive):
+                        frame = await sub.queue.get()
+                except TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if frame is None:
+                    yield _frame("reset", {"insult_id": sub.insult_id})
+                    return
+                yield frame
+        finally:
+            self.unsubscribe(sub)
+
+    # ----- Conexión LISTEN -----
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        self.received += 1
+        try:
+            message = json.loads(payload)
+            subs = self._subs.get(message["insult_id"])
+        except (ValueError, KeyError, TypeError):
+            return
+        if not subs:
+            return
+        frame = _frame(message["event"], message["data"])
+        for sub in list(subs):
+            try:
+                sub.queue.put_nowait(frame)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                self.dropped += 1
+                self._drop(sub)
+
+    async def _listen(self) -> None:
+        # Solo se importa con el primer suscriptor: no pesa en el arranque del worker.
+        import asyncpg
+
+        async_engine = get_async_engine()
+        args, kwargs = async_engine.dialect.create_connect_args(async_engine.url)
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(*args, **kwargs)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _: closed.set())
+                await conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+                self.connections += 1
+                self.last_error = None
+                self._ready.set()
+                while not closed.is_set():
+                    try:
+                        with anyio.fail_after(self.keepalive):
+                            await closed.wait()
+                    except TimeoutError:
+                        # Detecta conexiones muertas que el servidor no llegó a cerrar.
+                        await conn.execute("SELECT 1")
+            except Exception as e:
+                self.last_error = str(e)[:200]
+            finally:
+                self._ready.clear()
+                self._drop_all()
+                if conn is not None:
+                    conn.terminate()
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def stop(self) -> None:
+        """Cierra la conexión LISTEN y todos los streams (al apagar el worker)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": live_events_enabled(),
+            "connected": self._ready.is_set(),
+            "subscribers": self.subscribers,
+            "insults": len(self._subs),
+            "connections": self.connections,
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "last_error": self.last_error,
+        }
+
+
+live_events = LiveEvents(
+    settings.live_events_queue_size, settings.live_events_keepalive, settings.live_events_max_subscribers
+)
@@ -1,5 +1,9 @@
 # main.py
+from startup import startup_report, FirstRequestTimer
 import os
+from contextlib import asynccontextmanager
+
+import anyio
 from fastapi import FastAPI, Depends
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
@@ -8,19 +12,52 @@ from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
+startup_report.mark("framework_imports")
 
+from database import engine, get_db, get_async_engine, get_replica_engine, THREADPOOL_SIZE
+startup_report.mark("engine_init")
 import models
-from database import engine, get_db
+startup_report.mark("models")
+from counters import counter_buffer
 
 # ------------------------------
 # Cargar variables de entorno
 # ------------------------------
 load_dotenv()
 
+# ------------------------------
+# Arranque / parada
+# ------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Threadpool de las rutas síncronas: mismo tamaño que el pool de conexiones (pool_size + max_overflow).
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # El esquema lo gestiona Alembic; create_all solo si se pide (desarrollo local).
+    if os.getenv("DB_CREATE_ALL", "false").lower() in ("1", "true", "yes"):
+        await anyio.to_thread.run_sync(models.Base.metadata.create_all, engine)
+        startup_report.mark("create_all")
+    # Deltas de contadores que quedaron sin sumar (worker caído o apagado a medias).
+    if counter_buffer.enabled and engine.dialect.name == "postgresql":
+        await anyio.to_thread.run_sync(counter_buffer.flush)
+        startup_report.mark("counter_flush")
+    startup_report.ready()
+    yield
+    # Cierra los streams SSE abiertos: si no, el apagado esperaría a que los clientes se vayan.
+    from live_events import live_events
+
+    await live_events.stop()
+    if counter_buffer.enabled:
+        await anyio.to_thread.run_sync(counter_buffer.stop)
+    for get_engine in (get_async_engine, get_replica_engine):
+        if get_engine.cache_info().currsize:
+            await get_engine().dispose()
+
+
 # ------------------------------
 # Inicializar la app
 # ------------------------------
 app = FastAPI(
+    lifespan=lifespan,
     title="Arrechoteca",
     version="1.0",
     description="Diccionario de jerga guayaca: palabras y expresiones coloquiales de la costa ecuatoriana. Consulta significados, ejemplos y (con cuenta) comenta palabras o accede a insultos de la jerga.",
@@ -54,10 +91,8 @@ app.add_middleware(
     allowed_hosts=["*"],
 )
 
-# ------------------------------
-# Crear tablas
-# ------------------------------
-models.Base.metadata.create_all(bind=engine)
+# Mide la primera petición del worker (informe de arranque en /metrics)
+app.add_middleware(FirstRequestTimer)
 
 # ------------------------------
 # Dependencia DB
@@ -87,9 +122,16 @@ def root():
 # ------------------------------
 # Routers
 # ------------------------------
-from routers import categories, words, auth, insults, test_guayaco
+from routers import categories, words, auth, insults, test_guayaco, metrics, export, sync, search
 app.include_router(categories.router)
 app.include_router(words.router)
 app.include_router(auth.router)
 app.include_router(insults.router)
-app.include_router(test_guayaco.router)
\ No newline at end of file
+app.include_router(test_guayaco.router)
+# GET /metrics/ solo se monta con METRICS_TOKEN.
+if metrics.enabled():
+    app.include_router(metrics.router)
+app.include_router(export.router)
+app.include_router(sync.router)
+app.include_router(search.router)
+startup_report.mark("routers")
\ No newline at end of file
@@ -1,7 +1,20 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Table, DateTime, func, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, Text, Table, DateTime, func, Boolean, Index
+from sqlalchemy.orm import relationship, validates
 from database import Base
 from datetime import datetime
+from normalize import fold
+
+
+def _folded(source: str):
+    """
+    Default de las columnas *_key: el valor de `source` plegado (normalize.fold), para los
+    INSERT de Core de una fila. Los cambios por el ORM los fija @validates; los INSERT
+    multi-fila (importación masiva) envían la clave explícitamente.
+    """
+    def default(context):
+        return fold(context.get_current_parameters()[source])
+    return default
+
 
 # ==============================
 # MANY-TO-MANY RELATIONSHIP
@@ -21,9 +34,18 @@ class Category(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), unique=True, nullable=False)
+    # `name` sin tildes ni mayúsculas (el plegado puede alargar el texto: "ß" -> "ss")
+    name_key = Column(String(200), unique=True, index=True, nullable=False, default=_folded("name"))
+    # Versión de cambio para GET /sync (la fija un trigger en PostgreSQL, ver sync_versions.py)
+    sync_version = Column(BigInteger, nullable=True, index=True)
 
     words = relationship("Word", secondary=word_category, back_populates="categories")
 
+    @validates("name")
+    def _set_name_key(self, _, value):
+        self.name_key = fold(value)
+        return value
+
 # ==============================
 # WORD MODEL
 # ==============================
@@ -32,12 +54,22 @@ class Word(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     word = Column(String(100), unique=True, nullable=False)
+    # `word` sin tildes ni mayúsculas: "Ñaño" y "ñano" chocan en este índice único.
+    word_key = Column(String(200), unique=True, index=True, nullable=False, default=_folded("word"))
     meaning = Column(Text, nullable=False)
     is_active = Column(Boolean, default=False, nullable=False)
+    # Versión de cambio para GET /sync (la fija un trigger en PostgreSQL, ver sync_versions.py)
+    sync_version = Column(BigInteger, nullable=True, index=True)
 
-    categories = relationship("Category", secondary=word_category, back_populates="words")
+    # Orden explícito: sin ORDER BY el plan del JOIN decide el orden de las categorías.
+    categories = relationship("Category", secondary=word_category, back_populates="words", order_by="Category.id")
     examples = relationship("WordExample", back_populates="word", cascade="all, delete-orphan")
 
+    @validates("word")
+    def _set_word_key(self, _, value):
+        self.word_key = fold(value)
+        return value
+
 class WordExample(Base):
     __tablename__ = "word_examples"
 
@@ -45,6 +77,8 @@ class WordExample(Base):
     text = Column(Text, nullable=False)
     word_id = Column(Integer, ForeignKey("words.id"))
     is_active = Column(Boolean, default=False, nullable=False)
+    # Versión de cambio para GET /sync (la fija un trigger en PostgreSQL, ver sync_versions.py)
+    sync_version = Column(BigInteger, nullable=True, index=True)
 
     word = relationship("Word", back_populates="examples")
 
@@ -56,9 +90,17 @@ class InsultTag(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(80), unique=True, nullable=False)
+    name_key = Column(String(160), unique=True, index=True, nullable=False, default=_folded("name"))
+    # Versión de cambio para GET /sync (la fija un trigger en PostgreSQL, ver sync_versions.py)
+    sync_version = Column(BigInteger, nullable=True, index=True)
 
     insults = relationship("Insult", back_populates="tag")
 
+    @validates("name")
+    def _set_name_key(self, _, value):
+        self.name_key = fold(value)
+        return value
+
 
 # ==============================
 # INSULT MODEL
@@ -68,15 +110,38 @@ class Insult(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     insult = Column(String(100), unique=True, nullable=False)
+    insult_key = Column(String(200), unique=True, index=True, nullable=False, default=_folded("insult"))
     meaning = Column(Text, nullable=False)
     is_active = Column(Boolean, default=False, nullable=False)
     tag_id = Column(Integer, ForeignKey("insult_tags.id"), nullable=True)
+    # Versión de cambio para GET /sync (la fija un trigger en PostgreSQL, ver sync_versions.py)
+    sync_version = Column(BigInteger, nullable=True, index=True)
+
+    # Contadores desnormalizados: se actualizan en la misma transacción que cada
+    # estrellita/comentario, o por lotes con COUNTER_WRITE_BEHIND (ver counters.py).
+    star_count = Column(Integer, default=0, server_default="0", nullable=False)
+    comments_count = Column(Integer, default=0, server_default="0", nullable=False)
 
     tag = relationship("InsultTag", back_populates="insults")
     examples = relationship("InsultExample", back_populates="insult", cascade="all, delete-orphan")
     comments = relationship("InsultComment", back_populates="insult", cascade="all, delete-orphan")
     stars = relationship("InsultStar", back_populates="insult", cascade="all, delete-orphan")
 
+    @validates("insult")
+    def _set_insult_key(self, _, value):
+        self.insult_key = fold(value)
+        return value
+
+    # Un índice por cada orden de GET /bad_words/ (con y sin tag_id): la paginación por
+    # cursor recorre el índice en orden. Sin tag, "alpha" usa el índice único de `insult`.
+    __table_args__ = (
+        Index("ix_insults_star_count_id", "star_count", "id"),
+        Index("ix_insults_comments_count_id", "comments_count", "id"),
+        Index("ix_insults_tag_id_insult", "tag_id", "insult"),
+        Index("ix_insults_tag_id_star_count_id", "tag_id", "star_count", "id"),
+        Index("ix_insults_tag_id_comments_count_id", "tag_id", "comments_count", "id"),
+    )
+
 class InsultExample(Base):
     __tablename__ = "insult_examples"
 
@@ -84,6 +149,8 @@ class InsultExample(Base):
     text = Column(Text, nullable=False)
     insult_id = Column(Integer, ForeignKey("insults.id"))
     is_active = Column(Boolean, default=False, nullable=False)
+    # Versión de cambio para GET /sync (la fija un trigger en PostgreSQL, ver sync_versions.py)
+    sync_version = Column(BigInteger, nullable=True, index=True)
 
     insult = relationship("Insult", back_populates="examples")
 
@@ -115,6 +182,10 @@ class InsultComment(Base):
     comment = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Contadores desnormalizados de estrellitas y likes
+    star_count = Column(Integer, default=0, server_default="0", nullable=False)
+    likes_count = Column(Integer, default=0, server_default="0", nullable=False)
+
     # ==============================
     # SELF-REFERENTIAL RELATIONSHIP
     # ==============================
@@ -145,6 +216,13 @@ class InsultComment(Base):
     # Likes: un usuario solo puede dar un like por comentario
     likes = relationship("CommentLike", back_populates="comment", cascade="all, delete-orphan")
 
+    # Páginas por cursor (created_at, id): primer nivel de un insulto (parent_id NULL) y
+    # respuestas de un comentario. El segundo también sirve a replies_count y al CTE del hilo.
+    __table_args__ = (
+        Index("ix_insult_comments_insult_id_parent_id_created_at_id", "insult_id", "parent_id", "created_at", "id"),
+        Index("ix_insult_comments_parent_id_created_at_id", "parent_id", "created_at", "id"),
+    )
+
 
 # ==============================
 # COMMENT STAR (una estrellita por usuario por comentario)
@@ -215,4 +293,30 @@ class TestGuayacoAnswer(Base):
     order = Column(Integer, nullable=False)
     is_correct = Column(Boolean, default=False, nullable=False)
 
-    question = relationship("TestGuayaco", back_populates="answers")
\ No newline at end of file
+    question = relationship("TestGuayaco", back_populates="answers")
+
+
+# ==============================
+# SYNC TOMBSTONES (filas borradas, para GET /sync)
+# ==============================
+class SyncTombstone(Base):
+    __tablename__ = "sync_tombstones"
+
+    id = Column(BigInteger, primary_key=True)
+    table_name = Column(String(50), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    sync_version = Column(BigInteger, nullable=False, index=True)
+
+
+# ==============================
+# COUNTER DELTAS (votos aún no sumados a su contador, modo write-behind; ver counters.py)
+# ==============================
+class CounterDelta(Base):
+    __tablename__ = "counter_deltas"
+
+    id = Column(BigInteger, primary_key=True)
+    counter = Column(String(50), nullable=False)  # "tabla.columna", ej. "insults.star_count"
+    row_id = Column(Integer, nullable=False)
+    delta = Column(Integer, nullable=False)
+
+    __table_args__ = (Index("ix_counter_deltas_counter_row_id", "counter", "row_id"),)
@@ -0,0 +1,11 @@
+import unicodedata
+
+
+def fold(text: str) -> str:
+    """
+    Forma de comparación de un término: sin tildes ni diéresis (también ñ -> n),
+    en minúsculas y con los espacios colapsados. "Ñaño " y "ñano" dan lo mismo.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
@@ -0,0 +1,63 @@
+"""
+Cursores opacos para paginación keyset.
+
+El cursor codifica la clave de orden de la última fila devuelta (ej. `[star_count, id]`);
+la página siguiente se pide con `WHERE (clave) > / < (cursor)` sobre un índice compuesto,
+así cada página es un range scan del índice y no depende de OFFSET.
+"""
+import base64
+import json
+import threading
+import time
+from typing import Any, List, Optional
+
+from fastapi import HTTPException
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[list]:
+    """Devuelve la lista de `size` valores del cursor, o None si no hay cursor. Cursor inválido -> 400."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return values
+
+
+class CachedCount:
+    """
+    Total de filas de un listado, cacheado en el proceso durante `ttl` segundos.
+    Las escrituras del propio worker lo ajustan con `adjust`; el resto de cambios
+    (otros workers, ediciones en la BD) se recogen al caducar.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._value: Optional[int] = None
+        self._counted_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[int]:
+        """El total cacheado, o None si no hay o caducó."""
+        if self._value is None or time.monotonic() - self._counted_at > self.ttl:
+            return None
+        return self._value
+
+    def set(self, value: int) -> None:
+        with self._lock:
+            self._value = value
+            self._counted_at = time.monotonic()
+
+    def adjust(self, delta: int) -> None:
+        with self._lock:
+            if self._value is not None:
+                self._value = max(self._value + delta, 0)
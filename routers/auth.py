@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import Annotated
 from database import get_db
-from auth.dependencies import get_current_user, require_auth
+from auth.dependencies import get_current_user, require_auth, upsert_user
 from schemas.user import UserResponse, TokenPayload, ProtectedResponse, AuthTestResponse
 from config import settings
 import models
@@ -17,29 +17,16 @@ db_dependency = Annotated[Session, Depends(get_db)]
     summary="Usuario actual",
     description="Devuelve la información del usuario autenticado (JWT). Crea el usuario en BD si no existe.",
 )
-async def get_current_user_info(
+def get_current_user_info(
     current_user: TokenPayload = Depends(get_current_user),
     db: db_dependency = None
 ):
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    user_id = current_user.sub
-    email = current_user.email
-    
-    # Buscar o crear usuario en la base de datos
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not db_user:
-        # Crear usuario si no existe (datos básicos desde JWT)
-        db_user = models.User(
-            id=user_id,
-            email=email,
-            full_name=None,  # Se puede actualizar después
-            avatar_url=None
-        )
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+    # Crear usuario si no existe (datos básicos desde JWT)
+    upsert_user(db, current_user)
+    db_user = db.get(models.User, current_user.sub)
     
     return db_user
 
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from database import get_db
+from database import get_read_db
 import models
 from schemas.categories import Category
 from schemas.words import WordBase
@@ -19,9 +20,9 @@ router = APIRouter(
     summary="Listar categorías",
     description="Devuelve todas las categorías disponibles para clasificar palabras de la jerga.",
 )
-async def get_all_categories(db: Session = Depends(get_db)):
-    categories = db.query(models.Category).all()
-    return categories
+async def get_all_categories(db: AsyncSession = Depends(get_read_db)):
+    categories = await db.scalars(select(models.Category))
+    return categories.all()
 
 @router.get(
     "/{category_id}/words",
@@ -29,12 +30,16 @@ async def get_all_categories(db: Session = Depends(get_db)):
     summary="Palabras por categoría",
     description="Devuelve todas las palabras asociadas a una categoría por su ID.",
 )
-def get_words_by_category(category_id: int, db: Session = Depends(get_db)):
+async def get_words_by_category(category_id: int, db: AsyncSession = Depends(get_read_db)):
     # Verificar si la categoría existe
-    category = db.query(models.Category).filter(models.Category.id == category_id).first()
+    category = await db.get(models.Category, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Categoría no existe")
     
-    # Traer todas las palabras asociadas a esa categoría
-    words = category.words  # gracias al relationship many-to-many
-    return words
\ No newline at end of file
+    # Traer todas las palabras asociadas a esa categoría (tabla many-to-many)
+    words = await db.scalars(
+        select(models.Word)
+        .join(models.word_category, models.word_category.c.word_id == models.Word.id)
+        .where(models.word_category.c.category_id == category_id)
+    )
+    return words.all()
\ No newline at end of file
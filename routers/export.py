@@ -0,0 +1,133 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Callable, Iterable, List, Literal, Sequence
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+
+from database import AsyncSessionLocal, get_read_engine
+import models
+
+router = APIRouter(
+    prefix="/export",
+    tags=["Exportación"],
+)
+
+# Filas que se traen del cursor de servidor (y se escriben en la respuesta) por vuelta.
+EXPORT_BATCH_SIZE = 500
+
+_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+ExportFormat = Literal["ndjson", "csv"]
+
+
+# ----- Filas -----
+# Columnas de cada exportación: la cabecera CSV sale siempre, aunque no haya filas.
+WORD_COLUMNS = ("id", "word", "meaning", "is_active", "category_ids", "categories", "examples")
+INSULT_COLUMNS = ("id", "insult", "meaning", "is_active", "tag_id", "tag", "examples", "star_count", "comments_count")
+
+
+def _word_row(w: models.Word) -> dict:
+    return {
+        "id": w.id,
+        "word": w.word,
+        "meaning": w.meaning,
+        "is_active": w.is_active,
+        "category_ids": [c.id for c in w.categories],
+        "categories": [c.name for c in w.categories],
+        "examples": [e.text for e in w.examples],
+    }
+
+
+def _insult_row(i: models.Insult) -> dict:
+    return {
+        "id": i.id,
+        "insult": i.insult,
+        "meaning": i.meaning,
+        "is_active": i.is_active,
+        "tag_id": i.tag_id,
+        "tag": i.tag.name if i.tag else None,
+        "examples": [e.text for e in i.examples],
+        "star_count": i.star_count,
+        "comments_count": i.comments_count,
+    }
+
+
+def _csv_value(value) -> str:
+    # Listas unidas por "|": el mismo formato que acepta POST /words/import en category_ids.
+    if isinstance(value, list):
+        return "|".join(str(v) for v in value)
+    return "" if value is None else str(value)
+
+
+def _csv_lines(rows: Iterable[Sequence]) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue().encode()
+
+
+def _encode_batch(rows: List[dict], fmt: ExportFormat, columns: Sequence[str]) -> bytes:
+    if fmt == "ndjson":
+        return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows).encode()
+    return _csv_lines([_csv_value(r[c]) for c in columns] for r in rows)
+
+
+async def _stream(
+    stmt, to_row: Callable[[object], dict], columns: Sequence[str], fmt: ExportFormat
+) -> AsyncIterator[bytes]:
+    """
+    Recorre `stmt` con un cursor de servidor (`yield_per`) y emite cada lote ya serializado.
+    La sesión vive dentro del generador: se cierra al terminar o si el cliente se desconecta
+    (Starlette cancela el generador y la consulta se aborta).
+    """
+    if fmt == "csv":
+        yield _csv_lines([columns])
+    async with AsyncSessionLocal(bind=await get_read_engine()) as db:
+        result = await db.stream_scalars(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for batch in result.partitions():
+            # El identity map guarda referencias débiles: cada lote se libera al soltar `batch`.
+            yield _encode_batch([to_row(obj) for obj in batch], fmt, columns)
+
+
+def _response(
+    stmt, to_row: Callable[[object], dict], columns: Sequence[str], fmt: ExportFormat, name: str
+) -> StreamingResponse:
+    return StreamingResponse(
+        _stream(stmt, to_row, columns, fmt),
+        media_type=_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
+@router.get(
+    "/words",
+    summary="Exportar palabras",
+    description=(
+        "Descarga todo el diccionario (palabras con categorías y ejemplos) en NDJSON o CSV, "
+        "en streaming: la memoria del servidor no depende del tamaño de la tabla."
+    ),
+)
+async def export_words(format: ExportFormat = "ndjson"):
+    stmt = (
+        select(models.Word)
+        .options(selectinload(models.Word.categories), selectinload(models.Word.examples))
+        .order_by(models.Word.id)
+    )
+    return _response(stmt, _word_row, WORD_COLUMNS, format, "words")
+
+
+@router.get(
+    "/insults",
+    summary="Exportar insultos",
+    description="Descarga todos los insultos con tag, ejemplos y conteos en NDJSON o CSV, en streaming.",
+)
+async def export_insults(format: ExportFormat = "ndjson"):
+    stmt = (
+        select(models.Insult)
+        .options(joinedload(models.Insult.tag), selectinload(models.Insult.examples))
+        .order_by(models.Insult.id)
+    )
+    return _response(stmt, _insult_row, INSULT_COLUMNS, format, "insults")
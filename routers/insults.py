@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload, selectinload
-from sqlalchemy import func
-from typing import List, Optional
-
-from database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
+from sqlalchemy import String, delete, exists, false, func, insert, literal, select, text, tuple_, update
+from datetime import datetime
+from typing import Iterable, List, Literal, Optional, Tuple
+
+from database import AsyncSessionLocal, get_db, get_read_db, get_read_engine
 from auth.dependencies import require_auth, get_current_user, ensure_user_in_db
 from schemas.user import TokenPayload
 from schemas.insults import (
@@ -19,9 +22,16 @@ from schemas.insults import (
     InsultCommentUpdate,
     LikeResponse,
     StarResponse,
+    UserCommentAuthor,
     InsultDeleteResponse,
     DeleteResponse,
 )
+from counters import counter_buffer
+from live_events import NOTIFY_CHANNEL, live_events_enabled, publish
+from normalize import fold
+from pagination import decode_cursor, encode_cursor
+from schemas.suggest import SimilarResponse, Suggestion
+from suggest_index import MAX_DISTANCE, insult_suggestions
 import models
 
 router = APIRouter(
@@ -31,9 +41,34 @@ router = APIRouter(
 )
 
 
-def _insult_with_counts(insult: models.Insult, user_id: Optional[str] = None) -> Insult:
+def _insults_with_counts_query(user_id: Optional[str] = None, insult_ids: Optional[Iterable[int]] = None):
+    """
+    SELECT de insultos con star_count, comments_count y starred_by_me.
+    Los conteos son columnas desnormalizadas; starred_by_me es un EXISTS sobre insult_stars.
+    """
+    if user_id:
+        starred_by_me = exists().where(
+            models.InsultStar.insult_id == models.Insult.id,
+            models.InsultStar.user_id == user_id,
+        )
+    else:
+        starred_by_me = false()
+    stmt = (
+        select(
+            models.Insult,
+            models.Insult.star_count,
+            models.Insult.comments_count,
+            starred_by_me,
+        )
+        .options(selectinload(models.Insult.examples), joinedload(models.Insult.tag))
+    )
+    if insult_ids is not None:
+        stmt = stmt.where(models.Insult.id.in_(list(insult_ids)))
+    return stmt
+
+
+def _insult_with_counts(insult: models.Insult, star_count: int, comments_count: int, starred_by_me: bool) -> Insult:
     """Construye respuesta de insulto con comments_count, star_count y starred_by_me."""
-    stars = insult.stars or []
     return Insult(
         id=insult.id,
         insult=insult.insult,
@@ -42,12 +77,294 @@ def _insult_with_counts(insult: models.Insult, user_id: Optional[str] = None) ->
         tag_id=insult.tag_id,
         tag=insult.tag,
         examples=insult.examples,
-        comments_count=len(insult.comments) if insult.comments else 0,
-        star_count=len(stars),
-        starred_by_me=any(s.user_id == user_id for s in stars) if user_id else False,
+        comments_count=comments_count,
+        star_count=star_count,
+        starred_by_me=bool(starred_by_me),
+    )
+
+
+def _bump_counter(db: Session, column, row_id: int, delta: int) -> int:
+    """
+    Suma `delta` a un contador desnormalizado (ej. models.Insult.star_count) dentro de la
+    transacción actual y devuelve el nuevo valor. El UPDATE es atómico en la BD.
+    """
+    model = column.class_
+    stmt = (
+        update(model)
+        .where(model.id == row_id)
+        .values({column.key: column + delta})
+        .returning(column)
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).scalar_one()
+
+
+# Toggle de voto en una sola sentencia (PostgreSQL): borra el voto; si no había, lo inserta
+# (ON CONFLICT DO NOTHING); y suma la diferencia al contador del padre. Va como texto porque
+# el insert de postgresql de SQLAlchemy no entra en la caché de sentencias compiladas.
+_TOGGLE_VOTE_SQL = """
+WITH removed AS (
+    DELETE FROM {votes} WHERE {parent_key} = :parent_id AND user_id = :user_id RETURNING 1
+), added AS (
+    INSERT INTO {votes} ({parent_key}, user_id)
+    SELECT id, :user_id FROM {parents} WHERE id = :parent_id AND NOT EXISTS (SELECT 1 FROM removed)
+    ON CONFLICT DO NOTHING
+    RETURNING 1
+), bumped AS (
+    UPDATE {parents} SET {counter} = {counter} + (SELECT count(*) FROM added) - (SELECT count(*) FROM removed)
+    WHERE id = :parent_id
+    RETURNING {counter}, {insult_key} AS insult_id
+), result AS (
+    SELECT {counter} AS value, (SELECT count(*) FROM removed) AS removed, insult_id FROM bumped
+)
+SELECT value, removed{notify} FROM result
+"""
+
+# Igual, en modo write-behind (ver counters.py): en vez de tocar la fila del padre deja el
+# +1/-1 en counter_deltas. El conteo devuelto es el contador más lo pendiente de sumar.
+_TOGGLE_VOTE_BUFFERED_SQL = """
+WITH parent AS (
+    SELECT id, {counter} AS n, {insult_key} AS insult_id FROM {parents} WHERE id = :parent_id
+), removed AS (
+    DELETE FROM {votes} WHERE {parent_key} = :parent_id AND user_id = :user_id RETURNING 1
+), added AS (
+    INSERT INTO {votes} ({parent_key}, user_id)
+    SELECT id, :user_id FROM parent WHERE NOT EXISTS (SELECT 1 FROM removed)
+    ON CONFLICT DO NOTHING
+    RETURNING 1
+), change AS (
+    SELECT (SELECT count(*) FROM added) - (SELECT count(*) FROM removed) AS delta
+), logged AS (
+    INSERT INTO counter_deltas (counter, row_id, delta)
+    SELECT :counter_name, :parent_id, delta FROM change WHERE delta <> 0
+), result AS (
+    SELECT
+        n + delta + COALESCE((SELECT sum(d.delta) FROM counter_deltas d WHERE d.counter = :counter_name AND d.row_id = :parent_id), 0) AS value,
+        (SELECT count(*) FROM removed) AS removed,
+        insult_id
+    FROM parent, change
+)
+SELECT value, removed{notify} FROM result
+"""
+
+# Evento `counter` para GET /bad_words/{id}/events, con el mismo formato que live_events.publish.
+_TOGGLE_VOTE_NOTIFY_SQL = """,
+    pg_notify(:channel, json_build_object(
+        'insult_id', insult_id, 'event', 'counter',
+        'data', json_build_object('target', :target, 'id', :parent_id, 'field', :field, 'value', value)
+    )::text)"""
+
+
+def _counter_event(target: str, row_id: int, field: str, value: int) -> Tuple[str, dict]:
+    """Evento `counter` de GET /bad_words/{id}/events (los toggles lo emiten desde su SQL)."""
+    return "counter", {"target": target, "id": row_id, "field": field, "value": value}
+
+
+def _toggle_vote(db: Session, vote, parent_key, counter, parent_id: int, user_id: str) -> Optional[Tuple[bool, int]]:
+    """
+    Da o quita el voto de `user_id` (fila de `vote`, ej. models.InsultStar, con FK `parent_key`)
+    sobre `parent_id`, ajusta el contador desnormalizado `counter` del padre y hace commit.
+    Devuelve (votado, nuevo conteo), o None si el padre no existe.
+
+    En PostgreSQL es un solo viaje a la BD. Si el mismo usuario toca dos veces a la vez, el
+    segundo INSERT choca con el primero y no hace nada: sin IntegrityError, el voto queda
+    puesto y el contador cuadra con las filas.
+    """
+    model = counter.class_
+    if db.bind.dialect.name == "postgresql":
+        buffered = counter_buffer.enabled
+        notify = live_events_enabled()
+        is_insult = model is models.Insult
+        sql = (_TOGGLE_VOTE_BUFFERED_SQL if buffered else _TOGGLE_VOTE_SQL).format(
+            votes=vote.__tablename__,
+            parent_key=parent_key.key,
+            parents=model.__tablename__,
+            counter=counter.key,
+            insult_key="id" if is_insult else "insult_id",
+            notify=_TOGGLE_VOTE_NOTIFY_SQL if notify else "",
+        )
+        params = {"parent_id": parent_id, "user_id": user_id}
+        if buffered:
+            params["counter_name"] = f"{model.__tablename__}.{counter.key}"
+        if notify:
+            params.update(channel=NOTIFY_CHANNEL, target="insult" if is_insult else "comment", field=counter.key)
+        row = db.execute(text(sql), params).first()
+        if row is None:
+            return None
+        db.commit()
+        if buffered:
+            counter_buffer.record()
+        return row[1] == 0, row[0]
+
+    # SQLite (desarrollo): los mismos pasos por separado; SQLite ya serializa las escrituras.
+    removed = db.execute(
+        delete(vote).where(parent_key == parent_id, vote.user_id == user_id).returning(vote.user_id)
+    ).first() is not None
+    if not removed:
+        db.execute(
+            insert(vote).from_select(
+                [parent_key.key, "user_id"],
+                select(model.id, literal(user_id, String)).where(model.id == parent_id),
+            )
+        )
+    count = db.execute(
+        update(model)
+        .where(model.id == parent_id)
+        .values({counter.key: counter + (-1 if removed else 1)})
+        .returning(counter)
+    ).scalar_one_or_none()
+    if count is None:
+        return None
+    db.commit()
+    return not removed, count
+
+
+def _comment_subtree_size(db: Session, comment_id: int) -> int:
+    """Número de comentarios que se borran en cascada con `comment_id` (él y todas sus respuestas)."""
+    tree = (
+        select(models.InsultComment.id)
+        .where(models.InsultComment.id == comment_id)
+        .cte("tree", recursive=True)
+    )
+    tree = tree.union_all(select(models.InsultComment.id).where(models.InsultComment.parent_id == tree.c.id))
+    return db.scalar(select(func.count()).select_from(tree)) or 0
+
+
+def _comment_select(user_id: Optional[str] = None, with_replies_count: bool = False):
+    """
+    SELECT de comentarios como filas planas: autor, contadores desnormalizados y
+    starred_by_me/liked_by_me (EXISTS), sin cargar una fila por voto. Con `with_replies_count`
+    añade el número de respuestas directas (conteo sobre el índice de parent_id).
+    """
+    C = models.InsultComment
+    if user_id:
+        starred_by_me = exists().where(models.CommentStar.comment_id == C.id, models.CommentStar.user_id == user_id)
+        liked_by_me = exists().where(models.CommentLike.comment_id == C.id, models.CommentLike.user_id == user_id)
+    else:
+        starred_by_me = liked_by_me = false()
+    columns = [
+        C.id, C.insult_id, C.user_id, C.comment, C.created_at, C.parent_id, C.star_count, C.likes_count,
+        starred_by_me.label("starred_by_me"),
+        liked_by_me.label("liked_by_me"),
+        models.User.full_name,
+        models.User.avatar_url,
+        models.User.id.label("author_id"),
+    ]
+    if with_replies_count:
+        reply = aliased(C)
+        columns.append(select(func.count()).where(reply.parent_id == C.id).scalar_subquery().label("replies_count"))
+    return select(*columns).outerjoin(models.User, models.User.id == C.user_id)
+
+
+def _comment_from_row(r) -> InsultComment:
+    return InsultComment(
+        id=r.id,
+        insult_id=r.insult_id,
+        user_id=r.user_id,
+        comment=r.comment,
+        created_at=r.created_at,
+        parent_id=r.parent_id,
+        user=UserCommentAuthor(id=r.author_id, full_name=r.full_name, avatar_url=r.avatar_url) if r.author_id else None,
+        star_count=r.star_count,
+        starred_by_me=r.starred_by_me,
+        likes_count=r.likes_count,
+        liked_by_me=r.liked_by_me,
+        replies_count=getattr(r, "replies_count", 0),
+        replies=[],
+    )
+
+
+def _comment_thread_query(insult_id: int, user_id: Optional[str] = None):
+    """
+    Hilo completo de comentarios de un insulto en una sola consulta: un CTE recursivo parte de
+    los comentarios de primer nivel y baja por parent_id a cualquier profundidad.
+    """
+    C = models.InsultComment
+    thread = select(C.id).where(C.insult_id == insult_id, C.parent_id.is_(None)).cte("thread", recursive=True)
+    thread = thread.union_all(select(C.id).where(C.parent_id == thread.c.id))
+    return (
+        _comment_select(user_id)
+        .join(thread, thread.c.id == C.id)
+        .order_by(C.created_at.asc(), C.id.asc())
     )
 
 
+def _comment_tree(rows) -> List[InsultComment]:
+    """Arma el árbol en una pasada: cada respuesta se cuelga de su padre por id, en orden de creación."""
+    nodes = {r.id: _comment_from_row(r) for r in rows}
+    roots = []
+    for node in nodes.values():
+        if node.parent_id is None:
+            roots.append(node)
+        else:
+            parent = nodes[node.parent_id]
+            parent.replies.append(node)
+            parent.replies_count += 1
+    return roots
+
+
+def _after_comment(stmt, after: Optional[str]):
+    """
+    Aplica el cursor (created_at, id) de la última fila de la página anterior. created_at se
+    compara con el valor guardado de esa fila: así el empate en el mismo instante no depende de
+    cómo el driver serializa la fecha (SQLite la guarda sin microsegundos). Si la fila se borró
+    se usa la fecha del cursor (exacto en PostgreSQL).
+    """
+    cursor = decode_cursor(after, 2)
+    if cursor is None:
+        return stmt
+    try:
+        created_at, comment_id = datetime.fromisoformat(cursor[0]), int(cursor[1])
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    C = models.InsultComment
+    stored = select(C.created_at).where(C.id == comment_id).scalar_subquery()
+    return stmt.where(tuple_(C.created_at, C.id) > tuple_(func.coalesce(stored, created_at), comment_id))
+
+
+def _comment_cursor(items: List[InsultComment], limit: int) -> Optional[str]:
+    if len(items) < limit:
+        return None
+    return encode_cursor([items[-1].created_at.isoformat(), items[-1].id])
+
+
+async def _first_replies(db: AsyncSession, parents: List[InsultComment], n: int, user_id: Optional[str]) -> None:
+    """Cuelga de cada comentario sus `n` primeras respuestas directas (una consulta para toda la página)."""
+    parents = [p for p in parents if p.replies_count]
+    if not parents or n <= 0:
+        return
+    C = models.InsultComment
+    position = func.row_number().over(partition_by=C.parent_id, order_by=(C.created_at, C.id)).label("position")
+    ranked = (
+        _comment_select(user_id, with_replies_count=True)
+        .add_columns(position)
+        .where(C.parent_id.in_([p.id for p in parents]))
+        .subquery()
+    )
+    rows = await db.execute(
+        select(ranked).where(ranked.c.position <= n).order_by(ranked.c.created_at, ranked.c.id)
+    )
+    by_id = {p.id: p for p in parents}
+    for r in rows:
+        by_id[r.parent_id].replies.append(_comment_from_row(r))
+
+
+def _check_insult_unique(db: Session, insult: str, insult_id: Optional[int] = None) -> None:
+    # Por la clave normalizada: "Chucha" y "chucha" son el mismo insulto.
+    query = db.query(models.Insult.insult).filter(models.Insult.insult_key == fold(insult))
+    if insult_id is not None:
+        query = query.filter(models.Insult.id != insult_id)
+    existing = query.scalar()
+    if existing:
+        raise HTTPException(status_code=400, detail=f"Ya existe el insulto '{existing}'")
+
+
+def _load_insult(db: Session, insult_id: int, user_id: Optional[str] = None) -> Optional[Insult]:
+    """Relee un insulto (en el primario) con sus conteos tras una escritura."""
+    row = db.execute(_insults_with_counts_query(user_id, [insult_id])).first()
+    return _insult_with_counts(*row) if row else None
+
+
 # ----- Tags -----
 @router.get(
     "/tags",
@@ -55,8 +372,9 @@ def _insult_with_counts(insult: models.Insult, user_id: Optional[str] = None) ->
     summary="Listar tags de insultos",
     description="Devuelve todos los tags (ej. regionales, fuertes).",
 )
-def list_insult_tags(db: Session = Depends(get_db)):
-    return db.query(models.InsultTag).order_by(models.InsultTag.name).all()
+async def list_insult_tags(db: AsyncSession = Depends(get_read_db)):
+    tags = await db.scalars(select(models.InsultTag).order_by(models.InsultTag.name))
+    return tags.all()
 
 
 @router.post(
@@ -70,9 +388,9 @@ def create_insult_tag(
     db: Session = Depends(get_db),
     current_user: TokenPayload = Depends(ensure_user_in_db),
 ):
-    existing = db.query(models.InsultTag).filter(models.InsultTag.name == data.name).first()
+    existing = db.query(models.InsultTag.name).filter(models.InsultTag.name_key == fold(data.name)).scalar()
     if existing:
-        raise HTTPException(status_code=400, detail=f"Ya existe el tag '{data.name}'")
+        raise HTTPException(status_code=400, detail=f"Ya existe el tag '{existing}'")
     tag = models.InsultTag(name=data.name)
     db.add(tag)
     db.commit()
@@ -95,9 +413,9 @@ def update_insult_tag(
     tag = db.query(models.InsultTag).filter(models.InsultTag.id == tag_id).first()
     if not tag:
         raise HTTPException(status_code=404, detail="Tag no encontrado")
-    existing = db.query(models.InsultTag).filter(models.InsultTag.name == data.name, models.InsultTag.id != tag_id).first()
+    existing = db.query(models.InsultTag.name).filter(models.InsultTag.name_key == fold(data.name), models.InsultTag.id != tag_id).scalar()
     if existing:
-        raise HTTPException(status_code=400, detail=f"Ya existe otro tag con el nombre '{data.name}'")
+        raise HTTPException(status_code=400, detail=f"Ya existe otro tag con el nombre '{existing}'")
     tag.name = data.name
     db.commit()
     db.refresh(tag)
@@ -125,29 +443,77 @@ def delete_insult_tag(
 
 
 # ----- Insultos -----
+# Orden de GET /bad_words/: (columna de orden, descendente). El desempate siempre es por id
+# en el mismo sentido; cada orden tiene su índice compuesto (ver models.Insult).
+_INSULT_SORTS = {
+    "alpha": (models.Insult.insult, False),
+    "stars": (models.Insult.star_count, True),
+    "comments": (models.Insult.comments_count, True),
+}
+
+
+def _after_insult(cursor: Optional[str], sort: str) -> Optional[list]:
+    """
+    Cursor `[sort, valor, id]` de GET /bad_words/. Un cursor de otro orden o con tipos que no
+    corresponden (texto para `alpha`, enteros para el resto) -> 400, no un error de la BD.
+    """
+    after = decode_cursor(cursor, 3)
+    if after is None:
+        return None
+    cursor_sort, value, insult_id = after
+    value_type = str if sort == "alpha" else int
+    if (
+        cursor_sort != sort
+        or not isinstance(value, value_type)
+        or isinstance(value, bool)
+        or not isinstance(insult_id, int)
+        or isinstance(insult_id, bool)
+    ):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return [value, insult_id]
+
+
 @router.get(
     "/",
     response_model=List[Insult],
     summary="Listar insultos / puteadas",
-    description="Devuelve todos los insultos con ejemplos, tag y conteo de likes y comentarios.",
+    description=(
+        "Devuelve los insultos con ejemplos, tag y conteo de likes y comentarios. "
+        "Filtra por `tag_id` y ordena con `sort=alpha|stars|comments`. "
+        "Con `limit` pagina por cursor: la cabecera `X-Next-Cursor` trae el valor para `cursor` "
+        "de la página siguiente (no aparece en la última), válido solo con el mismo `sort`. "
+        "Sin `limit` devuelve la lista completa."
+    ),
 )
-def get_bad_words(
-    db: Session = Depends(get_db),
+async def get_bad_words(
+    response: Response,
+    tag_id: Optional[int] = None,
+    sort: Literal["alpha", "stars", "comments"] = "alpha",
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: Optional[TokenPayload] = Depends(get_current_user),
 ):
-    rows = (
-        db.query(models.Insult)
-        .options(
-            joinedload(models.Insult.examples),
-            joinedload(models.Insult.tag),
-            selectinload(models.Insult.stars),
-            selectinload(models.Insult.comments),
-        )
-        .order_by(models.Insult.insult.asc())
-        .all()
-    )
     user_id = current_user.sub if current_user else None
-    return [_insult_with_counts(r, user_id) for r in rows]
+    sort_column, descending = _INSULT_SORTS[sort]
+    stmt = _insults_with_counts_query(user_id)
+    if tag_id is not None:
+        stmt = stmt.where(models.Insult.tag_id == tag_id)
+    after = _after_insult(cursor, sort)
+    if after is not None:
+        key = tuple_(sort_column, models.Insult.id)
+        stmt = stmt.where(key < tuple_(*after) if descending else key > tuple_(*after))
+    if descending:
+        stmt = stmt.order_by(sort_column.desc(), models.Insult.id.desc())
+    else:
+        stmt = stmt.order_by(sort_column.asc(), models.Insult.id.asc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    items = [_insult_with_counts(*r) for r in await db.execute(stmt)]
+    if limit is not None and len(items) == limit:
+        last = items[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor([sort, getattr(last, sort_column.key), last.id])
+    return items
 
 
 @router.post(
@@ -161,6 +527,7 @@ def create_bad_word(
     db: Session = Depends(get_db),
     current_user: TokenPayload = Depends(ensure_user_in_db),
 ):
+    _check_insult_unique(db, data.insult)
     new_insult = models.Insult(
         insult=data.insult,
         meaning=data.meaning,
@@ -170,18 +537,8 @@ def create_bad_word(
     db.add(new_insult)
     db.commit()
     db.refresh(new_insult)
-    row = (
-        db.query(models.Insult)
-        .options(
-            joinedload(models.Insult.examples),
-            joinedload(models.Insult.tag),
-            selectinload(models.Insult.stars),
-            selectinload(models.Insult.comments),
-        )
-        .filter(models.Insult.id == new_insult.id)
-        .first()
-    )
-    return _insult_with_counts(row, current_user.sub)
+    insult_suggestions.add(new_insult.id, data.insult)
+    return _load_insult(db, new_insult.id, current_user.sub)
 
 
 @router.put(
@@ -196,26 +553,55 @@ def update_bad_word(
     db: Session = Depends(get_db),
     current_user: TokenPayload = Depends(ensure_user_in_db),
 ):
-    insult = (
-        db.query(models.Insult)
-        .options(
-            joinedload(models.Insult.examples),
-            joinedload(models.Insult.tag),
-            selectinload(models.Insult.stars),
-            selectinload(models.Insult.comments),
-        )
-        .filter(models.Insult.id == id)
-        .first()
-    )
+    insult = db.query(models.Insult).filter(models.Insult.id == id).first()
     if not insult:
         raise HTTPException(status_code=404, detail=f"Insulto con ID {id} no encontrado")
+    _check_insult_unique(db, data.insult, id)
     insult.insult = data.insult
     insult.meaning = data.meaning
     insult.is_active = data.is_active
     insult.tag_id = data.tag_id
     db.commit()
-    db.refresh(insult)
-    return _insult_with_counts(insult, current_user.sub)
+    insult_suggestions.add(id, data.insult)
+    return _load_insult(db, id, current_user.sub)
+
+
+# Declarada antes de GET /{id} para que "suggest" no se tome como id.
+@router.get(
+    "/suggest",
+    response_model=List[Suggestion],
+    summary="Autocompletar insultos",
+    description=(
+        "Insultos que empiezan por `prefix`, en orden alfabético, sin distinguir tildes ni "
+        "mayúsculas. Se responde desde un índice en memoria."
+    ),
+)
+async def suggest_bad_words(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+):
+    await insult_suggestions.ensure_loaded()
+    return [Suggestion(id=row_id, text=text) for row_id, text in insult_suggestions.lookup(prefix, limit)]
+
+
+@router.get(
+    "/similar",
+    response_model=SimilarResponse,
+    summary="¿Quisiste decir...? (insultos)",
+    description=(
+        "Insultos a pocas ediciones de `q` (letras cambiadas, añadidas o quitadas), sin distinguir "
+        "tildes ni mayúsculas: \"chuchaki\" encuentra \"chuchaqui\". Sin `max_distance` se usa 1 "
+        "para consultas de hasta 5 letras y 2 para las más largas. Incluye cuántos candidatos se "
+        "compararon y el tiempo, para ajustar umbrales."
+    ),
+)
+async def similar_bad_words(
+    q: str = Query(..., min_length=1, max_length=100),
+    max_distance: Optional[int] = Query(None, ge=0, le=MAX_DISTANCE),
+    limit: int = Query(10, ge=1, le=50),
+):
+    await insult_suggestions.ensure_loaded()
+    return insult_suggestions.similar(q, max_distance, limit)
 
 
 @router.get(
@@ -224,25 +610,16 @@ def update_bad_word(
     summary="Obtener un insulto por ID",
     description="Devuelve un insulto con ejemplos, tag, conteos y liked_by_me si estás autenticado.",
 )
-def get_bad_word_by_id(
+async def get_bad_word_by_id(
     id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: Optional[TokenPayload] = Depends(get_current_user),
 ):
-    insult = (
-        db.query(models.Insult)
-        .options(
-            joinedload(models.Insult.examples),
-            joinedload(models.Insult.tag),
-            selectinload(models.Insult.stars),
-            selectinload(models.Insult.comments),
-        )
-        .filter(models.Insult.id == id)
-        .first()
-    )
-    if not insult:
+    user_id = current_user.sub if current_user else None
+    row = (await db.execute(_insults_with_counts_query(user_id, [id]))).first()
+    if not row:
         raise HTTPException(status_code=404, detail=f"Insulto con ID {id} no encontrado")
-    return _insult_with_counts(insult, current_user.sub if current_user else None)
+    return _insult_with_counts(*row)
 
 
 @router.delete(
@@ -262,6 +639,7 @@ def delete_bad_word(
     name = insult.insult
     db.delete(insult)
     db.commit()
+    insult_suggestions.remove(id)
     return InsultDeleteResponse(success=True, message=f"Insulto '{name}' eliminado", deleted_id=id)
 
 
@@ -277,24 +655,13 @@ def add_example_to_insult(
     db: Session = Depends(get_db),
     current_user: TokenPayload = Depends(ensure_user_in_db),
 ):
-    insult = (
-        db.query(models.Insult)
-        .options(
-            joinedload(models.Insult.examples),
-            joinedload(models.Insult.tag),
-            selectinload(models.Insult.stars),
-            selectinload(models.Insult.comments),
-        )
-        .filter(models.Insult.id == insult_id)
-        .first()
-    )
+    insult = db.query(models.Insult).filter(models.Insult.id == insult_id).first()
     if not insult:
         raise HTTPException(status_code=404, detail=f"Insulto con ID {insult_id} no encontrado")
     ex = models.InsultExample(text=data.text, insult_id=insult_id, is_active=data.is_active)
     db.add(ex)
     db.commit()
-    db.refresh(insult)
-    return _insult_with_counts(insult, current_user.sub)
+    return _load_insult(db, insult_id, current_user.sub)
 
 
 @router.get(
@@ -303,12 +670,12 @@ def add_example_to_insult(
     summary="Listar ejemplos de un insulto",
     description="Devuelve los ejemplos de uso de un insulto.",
 )
-def list_insult_examples(insult_id: int, db: Session = Depends(get_db)):
-    insult = db.query(models.Insult).filter(models.Insult.id == insult_id).first()
+async def list_insult_examples(insult_id: int, db: AsyncSession = Depends(get_read_db)):
+    insult = await db.get(models.Insult, insult_id)
     if not insult:
         raise HTTPException(status_code=404, detail=f"Insulto con ID {insult_id} no encontrado")
-    examples = db.query(models.InsultExample).filter(models.InsultExample.insult_id == insult_id).all()
-    return examples
+    examples = await db.scalars(select(models.InsultExample).where(models.InsultExample.insult_id == insult_id))
+    return examples.all()
 
 
 @router.put(
@@ -364,30 +731,12 @@ def toggle_insult_star(
     db: Session = Depends(get_db),
     current_user: TokenPayload = Depends(ensure_user_in_db),
 ):
-    insult = db.query(models.Insult).filter(models.Insult.id == insult_id).first()
-    if not insult:
-        raise HTTPException(status_code=404, detail=f"Insulto con ID {insult_id} no encontrado")
-    existing = (
-        db.query(models.InsultStar)
-        .filter(
-            models.InsultStar.insult_id == insult_id,
-            models.InsultStar.user_id == current_user.sub,
-        )
-        .first()
-    )
-    if existing:
-        db.delete(existing)
-        starred = False
-    else:
-        db.add(models.InsultStar(insult_id=insult_id, user_id=current_user.sub))
-        starred = True
-    db.commit()
-    count = (
-        db.query(func.count(models.InsultStar.insult_id))
-        .filter(models.InsultStar.insult_id == insult_id)
-        .scalar()
-        or 0
+    result = _toggle_vote(
+        db, models.InsultStar, models.InsultStar.insult_id, models.Insult.star_count, insult_id, current_user.sub
     )
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Insulto con ID {insult_id} no encontrado")
+    starred, count = result
     return StarResponse(starred=starred, star_count=count)
 
 
@@ -396,79 +745,77 @@ def toggle_insult_star(
     "/{insult_id}/comments",
     response_model=List[InsultComment],
     summary="Listar comentarios de un insulto",
-    description="Devuelve comentarios con respuestas, autor, conteo de estrellas y si el usuario actual dio estrellita.",
+    description=(
+        "Sin `limit`: el hilo completo (respuestas a cualquier profundidad). Con `limit`: una página "
+        "de comentarios de primer nivel por orden de creación, cada uno con `replies_count` y sus "
+        "`replies` primeras respuestas; la siguiente página se pide con `after` = cabecera "
+        "`X-Next-Cursor`, y el resto de respuestas con `GET /bad_words/comments/{id}/replies`. "
+        "Incluye autor, conteos de estrellas y likes, y si el usuario actual dio estrellita o like."
+    ),
 )
-def get_insult_comments(
+async def get_insult_comments(
     insult_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    after: Optional[str] = None,
+    replies: int = Query(3, ge=0, le=20),
+    db: AsyncSession = Depends(get_read_db),
     current_user: Optional[TokenPayload] = Depends(get_current_user),
 ):
-    insult = db.query(models.Insult).filter(models.Insult.id == insult_id).first()
-    if not insult:
-        raise HTTPException(status_code=404, detail=f"Insulto con ID {insult_id} no encontrado")
-    comments = (
-        db.query(models.InsultComment)
-        .options(
-            joinedload(models.InsultComment.user),
-            selectinload(models.InsultComment.stars),
-            selectinload(models.InsultComment.likes),
-            joinedload(models.InsultComment.replies).joinedload(models.InsultComment.user),
-            joinedload(models.InsultComment.replies).selectinload(models.InsultComment.stars),
-            joinedload(models.InsultComment.replies).selectinload(models.InsultComment.likes),
-        )
-        .filter(
-            models.InsultComment.insult_id == insult_id,
-            models.InsultComment.parent_id.is_(None),
-        )
-        .order_by(models.InsultComment.created_at.asc())
-        .all()
-    )
     user_id = current_user.sub if current_user else None
-    out = []
-    for c in comments:
-        star_count = len(c.stars) if c.stars else 0
-        starred_by_me = any(s.user_id == user_id for s in (c.stars or []))
-        likes_count = len(c.likes) if c.likes else 0
-        liked_by_me = any(l.user_id == user_id for l in (c.likes or []))
-        replies_data = []
-        for r in (c.replies or []):
-            r_stars = len(r.stars) if r.stars else 0
-            r_starred = any(s.user_id == user_id for s in (r.stars or []))
-            r_likes = len(r.likes) if r.likes else 0
-            r_liked = any(l.user_id == user_id for l in (r.likes or []))
-            replies_data.append(
-                InsultComment(
-                    id=r.id,
-                    insult_id=r.insult_id,
-                    user_id=r.user_id,
-                    comment=r.comment,
-                    created_at=r.created_at,
-                    parent_id=r.parent_id,
-                    user=r.user,
-                    star_count=r_stars,
-                    starred_by_me=r_starred,
-                    likes_count=r_likes,
-                    liked_by_me=r_liked,
-                    replies=[],
-                )
-            )
-        out.append(
-            InsultComment(
-                id=c.id,
-                insult_id=c.insult_id,
-                user_id=c.user_id,
-                comment=c.comment,
-                created_at=c.created_at,
-                parent_id=c.parent_id,
-                user=c.user,
-                star_count=star_count,
-                starred_by_me=starred_by_me,
-                likes_count=likes_count,
-                liked_by_me=liked_by_me,
-                replies=replies_data,
-            )
+    C = models.InsultComment
+    if limit is None:
+        items = _comment_tree((await db.execute(_comment_thread_query(insult_id, user_id))).all())
+    else:
+        stmt = (
+            _comment_select(user_id, with_replies_count=True)
+            .where(C.insult_id == insult_id, C.parent_id.is_(None))
+            .order_by(C.created_at.asc(), C.id.asc())
+            .limit(limit)
         )
-    return out
+        items = [_comment_from_row(r) for r in await db.execute(_after_comment(stmt, after))]
+        await _first_replies(db, items, replies, user_id)
+        next_cursor = _comment_cursor(items, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    # Sin filas: solo entonces hace falta distinguir "sin comentarios" de "no existe".
+    if not items and await db.get(models.Insult, insult_id) is None:
+        raise HTTPException(status_code=404, detail=f"Insulto con ID {insult_id} no encontrado")
+    return items
+
+
+@router.get(
+    "/comments/{comment_id}/replies",
+    response_model=List[InsultComment],
+    summary="Respuestas de un comentario",
+    description=(
+        "Respuestas directas de un comentario por orden de creación, paginadas: la siguiente "
+        "página se pide con `after` = cabecera `X-Next-Cursor`. Cada respuesta trae su "
+        "`replies_count` para seguir bajando por el hilo."
+    ),
+)
+async def get_comment_replies(
+    comment_id: int,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Optional[TokenPayload] = Depends(get_current_user),
+):
+    C = models.InsultComment
+    stmt = (
+        _comment_select(current_user.sub if current_user else None, with_replies_count=True)
+        .where(C.parent_id == comment_id)
+        .order_by(C.created_at.asc(), C.id.asc())
+        .limit(limit)
+    )
+    items = [_comment_from_row(r) for r in await db.execute(_after_comment(stmt, after))]
+    if not items and await db.get(models.InsultComment, comment_id) is None:
+        raise HTTPException(status_code=404, detail="Comentario no encontrado")
+    next_cursor = _comment_cursor(items, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @router.post(
@@ -504,10 +851,10 @@ def create_insult_comment(
         parent_id=data.parent_id,
     )
     db.add(comment)
-    db.commit()
+    comments_count = _bump_counter(db, models.Insult.comments_count, insult_id, 1)
+    db.flush()
     db.refresh(comment)
-    db.refresh(comment.user)
-    return InsultComment(
+    out = InsultComment(
         id=comment.id,
         insult_id=comment.insult_id,
         user_id=comment.user_id,
@@ -521,6 +868,14 @@ def create_insult_comment(
         liked_by_me=False,
         replies=[],
     )
+    publish(
+        db,
+        insult_id,
+        ("comment_created", out.model_dump(mode="json")),
+        _counter_event("insult", insult_id, "comments_count", comments_count),
+    )
+    db.commit()
+    return out
 
 
 # ----- Like en comentario (un like por usuario por comentario) -----
@@ -535,30 +890,12 @@ def toggle_comment_like(
     db: Session = Depends(get_db),
     current_user: TokenPayload = Depends(ensure_user_in_db),
 ):
-    comment = db.query(models.InsultComment).filter(models.InsultComment.id == comment_id).first()
-    if not comment:
-        raise HTTPException(status_code=404, detail="Comentario no encontrado")
-    existing = (
-        db.query(models.CommentLike)
-        .filter(
-            models.CommentLike.comment_id == comment_id,
-            models.CommentLike.user_id == current_user.sub,
-        )
-        .first()
-    )
-    if existing:
-        db.delete(existing)
-        liked = False
-    else:
-        db.add(models.CommentLike(comment_id=comment_id, user_id=current_user.sub))
-        liked = True
-    db.commit()
-    count = (
-        db.query(func.count(models.CommentLike.comment_id))
-        .filter(models.CommentLike.comment_id == comment_id)
-        .scalar()
-        or 0
+    result = _toggle_vote(
+        db, models.CommentLike, models.CommentLike.comment_id, models.InsultComment.likes_count, comment_id, current_user.sub
     )
+    if result is None:
+        raise HTTPException(status_code=404, detail="Comentario no encontrado")
+    liked, count = result
     return LikeResponse(liked=liked, likes_count=count)
 
 
@@ -574,30 +911,12 @@ def toggle_comment_star(
     db: Session = Depends(get_db),
     current_user: TokenPayload = Depends(ensure_user_in_db),
 ):
-    comment = db.query(models.InsultComment).filter(models.InsultComment.id == comment_id).first()
-    if not comment:
-        raise HTTPException(status_code=404, detail="Comentario no encontrado")
-    existing = (
-        db.query(models.CommentStar)
-        .filter(
-            models.CommentStar.comment_id == comment_id,
-            models.CommentStar.user_id == current_user.sub,
-        )
-        .first()
-    )
-    if existing:
-        db.delete(existing)
-        starred = False
-    else:
-        db.add(models.CommentStar(comment_id=comment_id, user_id=current_user.sub))
-        starred = True
-    db.commit()
-    count = (
-        db.query(func.count(models.CommentStar.comment_id))
-        .filter(models.CommentStar.comment_id == comment_id)
-        .scalar()
-        or 0
+    result = _toggle_vote(
+        db, models.CommentStar, models.CommentStar.comment_id, models.InsultComment.star_count, comment_id, current_user.sub
     )
+    if result is None:
+        raise HTTPException(status_code=404, detail="Comentario no encontrado")
+    starred, count = result
     return StarResponse(starred=starred, star_count=count)
 
 
@@ -613,41 +932,22 @@ def update_insult_comment(
     db: Session = Depends(get_db),
     current_user: TokenPayload = Depends(ensure_user_in_db),
 ):
-    comment = (
-        db.query(models.InsultComment)
-        .options(
-            joinedload(models.InsultComment.user),
-            selectinload(models.InsultComment.stars),
-            selectinload(models.InsultComment.likes),
-        )
-        .filter(models.InsultComment.id == comment_id)
-        .first()
-    )
+    comment = db.query(models.InsultComment).filter(models.InsultComment.id == comment_id).first()
     if not comment:
         raise HTTPException(status_code=404, detail="Comentario no encontrado")
     if comment.user_id != current_user.sub:
         raise HTTPException(status_code=403, detail="Solo el autor puede editar este comentario")
     comment.comment = data.comment
-    db.commit()
-    db.refresh(comment)
-    star_count = len(comment.stars) if comment.stars else 0
-    starred_by_me = any(s.user_id == current_user.sub for s in (comment.stars or []))
-    likes_count = len(comment.likes) if comment.likes else 0
-    liked_by_me = any(l.user_id == current_user.sub for l in (comment.likes or []))
-    return InsultComment(
-        id=comment.id,
-        insult_id=comment.insult_id,
-        user_id=comment.user_id,
-        comment=comment.comment,
-        created_at=comment.created_at,
-        parent_id=comment.parent_id,
-        user=comment.user,
-        star_count=star_count,
-        starred_by_me=starred_by_me,
-        likes_count=likes_count,
-        liked_by_me=liked_by_me,
-        replies=[],
+    publish(
+        db,
+        comment.insult_id,
+        ("comment_updated", {"id": comment.id, "parent_id": comment.parent_id, "comment": comment.comment}),
     )
+    db.commit()
+    row = db.execute(
+        _comment_select(current_user.sub, with_replies_count=True).where(models.InsultComment.id == comment_id)
+    ).one()
+    return _comment_from_row(row)
 
 
 @router.delete(
@@ -666,6 +966,47 @@ def delete_insult_comment(
         raise HTTPException(status_code=404, detail="Comentario no encontrado")
     if comment.user_id != current_user.sub:
         raise HTTPException(status_code=403, detail="Solo el autor puede eliminar este comentario")
+    # Las respuestas se borran en cascada: descontarlas todas del insulto.
+    removed = _comment_subtree_size(db, comment_id)
+    comments_count = _bump_counter(db, models.Insult.comments_count, comment.insult_id, -removed)
+    publish(
+        db,
+        comment.insult_id,
+        ("comment_deleted", {"id": comment.id, "parent_id": comment.parent_id, "removed": removed}),
+        _counter_event("insult", comment.insult_id, "comments_count", comments_count),
+    )
     db.delete(comment)
     db.commit()
     return DeleteResponse(success=True, message="Comentario eliminado")
+
+
+# ----- Eventos en vivo (SSE) -----
+@router.get(
+    "/{insult_id}/events",
+    response_class=StreamingResponse,
+    summary="Eventos en vivo de un insulto (SSE)",
+    description=(
+        "Stream `text/event-stream` con los cambios del insulto: `comment_created`, `comment_updated`, "
+        "`comment_deleted` y `counter` (estrellitas, likes y comentarios). Empieza con `ready`; tras `ready` "
+        "o `reset` (cliente lento o reconexión del servidor) recarga los comentarios. Solo PostgreSQL."
+    ),
+    responses={501: {"description": "Requiere PostgreSQL"}, 503: {"description": "Eventos no disponibles"}},
+)
+async def insult_events(insult_id: int):
+    from live_events import LiveEventsUnavailable, live_events
+
+    if not live_events_enabled():
+        raise HTTPException(status_code=501, detail="Los eventos en vivo requieren PostgreSQL")
+    # Sesión corta: el stream no retiene una conexión del pool.
+    async with AsyncSessionLocal(bind=await get_read_engine()) as db:
+        if not await db.scalar(select(exists().where(models.Insult.id == insult_id))):
+            raise HTTPException(status_code=404, detail=f"Insulto con ID {insult_id} no encontrado")
+    try:
+        sub = await live_events.subscribe(insult_id)
+    except LiveEventsUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Eventos en vivo no disponibles: {e}")
+    return StreamingResponse(
+        live_events.stream(sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,56 @@
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from auth.dependencies import _get_jwks_client, token_cache, verify_pool
+from config import settings
+from counters import counter_buffer
+from database import engine, get_async_engine, get_replica_engine, pool_stats, replica_health
+from live_events import live_events
+from schemas.metrics import MetricsResponse
+from startup import startup_report
+from suggest_index import insult_suggestions, word_suggestions
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def enabled() -> bool:
+    return bool(settings.metrics_token)
+
+
+def require_metrics_token(token: HTTPAuthorizationCredentials = Depends(_bearer)) -> None:
+    """Exige `Authorization: Bearer <METRICS_TOKEN>` (no un token de usuario)."""
+    if not token or not hmac.compare_digest(token.credentials.encode(), settings.metrics_token.encode()):
+        raise HTTPException(status_code=401, detail="Token de métricas inválido")
+
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Métricas"],
+    dependencies=[Depends(require_metrics_token)],
+)
+
+
+@router.get(
+    "/",
+    response_model=MetricsResponse,
+    summary="Métricas del proceso",
+    description="Contadores internos del worker que atiende la petición: arranque, JWKS, caché de tokens verificados, pool de verificación, pools de conexiones, réplica, índices de autocompletado, write-behind de contadores y eventos en vivo.",
+)
+def get_metrics():
+    return MetricsResponse(
+        startup=startup_report.stats(),
+        jwks=_get_jwks_client().stats(),
+        token_cache=token_cache.stats(),
+        auth_verify={"mode": settings.auth_verify_mode, **verify_pool.stats()},
+        db_pool=pool_stats(engine),
+        # El engine async solo existe tras la primera petición que lo usa.
+        db_async_pool=pool_stats(get_async_engine().sync_engine) if get_async_engine.cache_info().currsize else None,
+        replica=replica_health.stats(),
+        db_replica_pool=pool_stats(get_replica_engine().sync_engine) if get_replica_engine.cache_info().currsize else None,
+        word_suggestions=word_suggestions.stats(),
+        insult_suggestions=insult_suggestions.stats(),
+        counter_buffer=counter_buffer.stats(),
+        live_events=live_events.stats(),
+    )
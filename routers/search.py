@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+
+from database import get_read_db
+from schemas.search import SearchResponse
+from text_search import search
+
+router = APIRouter(
+    prefix="/search",
+    tags=["Búsqueda"],
+)
+
+
+@router.get(
+    "/",
+    response_model=SearchResponse,
+    summary="Buscar palabras e insultos",
+    description=(
+        "Búsqueda de texto completo en palabras, insultos, sus significados y ejemplos, "
+        "sin distinguir tildes ni mayúsculas. Acepta la sintaxis de buscador web "
+        "(`\"frase exacta\"`, `-excluir`, `or`). Filtra con `type=word|insult`; pagina con `skip`/`limit`."
+    ),
+)
+async def search_all(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[Literal["word", "insult"]] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if db.bind.dialect.name != "postgresql":
+        raise HTTPException(status_code=501, detail="La búsqueda requiere PostgreSQL")
+    items = await search(db, q, type, skip, limit)
+    return SearchResponse(items=items, skip=skip, limit=limit)
@@ -0,0 +1,64 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import get_read_db
+from schemas.sync import SyncResponse
+from sync_versions import build_snapshot, collect_changes, snapshot_is_fresh
+
+router = APIRouter(
+    prefix="/sync",
+    tags=["Sincronización"],
+)
+
+# Un solo rebuild del snapshot a la vez por worker.
+_snapshot_lock = asyncio.Lock()
+
+
+def _require_postgres(db: AsyncSession) -> None:
+    if db.bind.dialect.name != "postgresql":
+        raise HTTPException(status_code=501, detail="La sincronización requiere PostgreSQL")
+
+
+@router.get(
+    "/",
+    response_model=SyncResponse,
+    summary="Cambios desde una versión",
+    description=(
+        "Devuelve palabras, ejemplos, categorías, insultos y tags creados o modificados desde `since`, "
+        "y los ids borrados en `deleted`. Guarda `version` y envíala como `since` la próxima vez. "
+        "Para la primera instalación descarga `/sync/snapshot` y sincroniza desde su `version`."
+    ),
+)
+async def get_changes(
+    since: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_db),
+):
+    _require_postgres(db)
+    return await collect_changes(db, since)
+
+
+@router.get(
+    "/snapshot",
+    summary="Snapshot completo (JSON gzip)",
+    description=(
+        "Todo el contenido sincronizable con el formato de `GET /sync/` (sin borrados), comprimido con gzip. "
+        "Se precalcula y se regenera como mucho cada `SYNC_SNAPSHOT_MAX_AGE` segundos."
+    ),
+)
+async def get_snapshot(db: AsyncSession = Depends(get_read_db)):
+    _require_postgres(db)
+    path = settings.sync_snapshot_path
+    if not snapshot_is_fresh(path, settings.sync_snapshot_max_age):
+        async with _snapshot_lock:
+            # Otra petición pudo regenerarlo mientras esperábamos.
+            if not snapshot_is_fresh(path, settings.sync_snapshot_max_age):
+                await build_snapshot(db, path)
+    return FileResponse(
+        path,
+        media_type="application/json",
+        headers={"Content-Encoding": "gzip", "Cache-Control": "public, max-age=300"},
+    )
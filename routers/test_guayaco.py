@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, select
 
-from database import get_db
+from database import get_db, get_read_db
 from auth.dependencies import ensure_user_in_db
 from schemas.user import TokenPayload
 from schemas.test_guayaco import (
@@ -29,25 +30,24 @@ router = APIRouter(
     summary="Listar preguntas (paginado)",
     description="Devuelve preguntas del test Guayaco paginadas, con sus respuestas.",
 )
-def list_questions(
+async def list_questions(
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     if limit < 1 or limit > 100:
         limit = 20
     if skip < 0:
         skip = 0
-    total = db.query(func.count(models.TestGuayaco.id)).scalar() or 0
-    questions = (
-        db.query(models.TestGuayaco)
-        .options(joinedload(models.TestGuayaco.answers))
+    total = await db.scalar(select(func.count(models.TestGuayaco.id))) or 0
+    questions = await db.scalars(
+        select(models.TestGuayaco)
+        .options(selectinload(models.TestGuayaco.answers))
         .order_by(models.TestGuayaco.id.asc())
         .offset(skip)
         .limit(limit)
-        .all()
     )
-    return TestGuayacoPaginated(items=questions, total=total, skip=skip, limit=limit)
+    return TestGuayacoPaginated(items=questions.all(), total=total, skip=skip, limit=limit)
 
 
 @router.get(
@@ -56,15 +56,14 @@ def list_questions(
     summary="Obtener una pregunta",
     description="Devuelve una pregunta por ID con sus 4 respuestas.",
 )
-def get_question(
+async def get_question(
     question_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    question = (
-        db.query(models.TestGuayaco)
-        .options(joinedload(models.TestGuayaco.answers))
-        .filter(models.TestGuayaco.id == question_id)
-        .first()
+    question = await db.scalar(
+        select(models.TestGuayaco)
+        .options(selectinload(models.TestGuayaco.answers))
+        .where(models.TestGuayaco.id == question_id)
     )
     if not question:
         raise HTTPException(status_code=404, detail=f"Pregunta con ID {question_id} no encontrada")
@@ -228,17 +227,16 @@ def delete_question(
     summary="Listar respuestas de una pregunta",
     description="Devuelve las 4 respuestas de una pregunta (ordenadas por order).",
 )
-def list_answers(
+async def list_answers(
     question_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    question = db.query(models.TestGuayaco).filter(models.TestGuayaco.id == question_id).first()
+    question = await db.get(models.TestGuayaco, question_id)
     if not question:
         raise HTTPException(status_code=404, detail=f"Pregunta con ID {question_id} no encontrada")
-    answers = (
-        db.query(models.TestGuayacoAnswer)
-        .filter(models.TestGuayacoAnswer.test_guayaco_id == question_id)
+    answers = await db.scalars(
+        select(models.TestGuayacoAnswer)
+        .where(models.TestGuayacoAnswer.test_guayaco_id == question_id)
         .order_by(models.TestGuayacoAnswer.order)
-        .all()
     )
-    return answers
+    return answers.all()
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
-from typing import List
-from database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, insert, inspect, select
+from typing import List, Literal, Optional
+from config import settings
+from database import get_async_db, get_db, get_read_db
+from normalize import fold
+from pagination import CachedCount, decode_cursor, encode_cursor
 from auth.dependencies import require_auth, ensure_user_in_db, security
 from schemas.user import TokenPayload
-from schemas.words import Word, WordExampleBase, WordCreate, WordExample, WordPaginated, WordDeleteResponse
+from schemas.suggest import SimilarResponse, Suggestion
+from schemas.words import Word, WordExampleBase, WordCreate, WordExample, WordPaginated, WordDeleteResponse, WordImportResult
+from suggest_index import MAX_DISTANCE, word_suggestions
+from word_import import import_words, iter_csv, iter_ndjson
 import models
 
 router = APIRouter(
@@ -14,30 +21,127 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# Total de palabras para WordPaginated: no se cuenta en cada página.
+words_total = CachedCount(settings.words_count_ttl)
+
+
+def _check_words_unique(db: Session, words: List[str], word_id: Optional[int] = None) -> None:
+    # Por la clave normalizada (una consulta al índice único): "Ñaño" y "ñano" son la misma palabra.
+    keys = {}
+    for word in words:
+        key = fold(word)
+        if key in keys:
+            raise HTTPException(status_code=400, detail=f"Palabra repetida en la petición: '{keys[key]}' y '{word}'")
+        keys[key] = word
+    if not keys:
+        return
+    query = db.query(models.Word.word).filter(models.Word.word_key.in_(keys))
+    if word_id is not None:
+        query = query.filter(models.Word.id != word_id)
+    existing = query.first()
+    if existing:
+        raise HTTPException(status_code=400, detail=f"Ya existe la palabra '{existing.word}'")
+
+
+def _reload_words(db: Session, word_ids: List[int]) -> List[models.Word]:
+    """
+    Carga las palabras `word_ids` (en ese orden) tras un commit, con categorías y ejemplos en
+    3 consultas en total (en vez de un refresh y dos lazy loads por palabra al serializar).
+    """
+    if not word_ids:
+        return []
+    by_id = {
+        w.id: w
+        for w in db.scalars(
+            select(models.Word)
+            .options(selectinload(models.Word.categories), selectinload(models.Word.examples))
+            .where(models.Word.id.in_(word_ids))
+            .execution_options(populate_existing=True)
+        ).all()
+    }
+    return [by_id[word_id] for word_id in word_ids]
+
+
 @router.get(
     "/",
     response_model=WordPaginated,
     summary="Listar palabras (paginado)",
-    description="Devuelve palabras paginadas. Usa `skip` y `limit` para infinite scroll (ej: skip=0 limit=20, luego skip=20 limit=20).",
+    description=(
+        "Devuelve palabras paginadas por orden alfabético. Para infinite scroll usa `after` con el "
+        "`next_cursor` de la página anterior (no se degrada al avanzar). `skip`/`limit` siguen "
+        "funcionando; con `after` se ignora `skip`. `total` se cachea unos segundos."
+    ),
 )
-def get_words(
+async def get_words(
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db),
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
     if limit < 1 or limit > 100:
         limit = 20
     if skip < 0:
         skip = 0
-    total = db.query(func.count(models.Word.id)).scalar() or 0
-    words = (
-        db.query(models.Word)
+    total = words_total.get()
+    if total is None:
+        total = await db.scalar(select(func.count(models.Word.id))) or 0
+        words_total.set(total)
+    # Con AsyncSession no hay lazy loading: categorías y ejemplos se cargan por lotes.
+    stmt = (
+        select(models.Word)
+        .options(selectinload(models.Word.categories), selectinload(models.Word.examples))
         .order_by(models.Word.word.asc())
-        .offset(skip)
         .limit(limit)
-        .all()
     )
-    return WordPaginated(items=words, total=total, skip=skip, limit=limit)
+    cursor = decode_cursor(after, 1)
+    if cursor is not None:
+        if not isinstance(cursor[0], str):
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+        # `word` es único: su índice da el orden y el punto de partida.
+        stmt = stmt.where(models.Word.word > cursor[0])
+        skip = 0
+    else:
+        stmt = stmt.offset(skip)
+    items = (await db.scalars(stmt)).all()
+    next_cursor = encode_cursor([items[-1].word]) if len(items) == limit else None
+    return WordPaginated(items=items, total=total, skip=skip, limit=limit, next_cursor=next_cursor)
+
+
+@router.get(
+    "/suggest",
+    response_model=List[Suggestion],
+    summary="Autocompletar palabras",
+    description=(
+        "Palabras que empiezan por `prefix`, en orden alfabético, sin distinguir tildes ni "
+        "mayúsculas (\"nano\" encuentra \"ñaño\"). Se responde desde un índice en memoria."
+    ),
+)
+async def suggest_words(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+):
+    await word_suggestions.ensure_loaded()
+    return [Suggestion(id=row_id, text=text) for row_id, text in word_suggestions.lookup(prefix, limit)]
+
+
+@router.get(
+    "/similar",
+    response_model=SimilarResponse,
+    summary="¿Quisiste decir...? (palabras)",
+    description=(
+        "Palabras a pocas ediciones de `q` (letras cambiadas, añadidas o quitadas), sin distinguir "
+        "tildes ni mayúsculas: \"chuchaki\" encuentra \"chuchaqui\". Sin `max_distance` se usa 1 "
+        "para consultas de hasta 5 letras y 2 para las más largas. Incluye cuántos candidatos se "
+        "compararon y el tiempo, para ajustar umbrales."
+    ),
+)
+async def similar_words(
+    q: str = Query(..., min_length=1, max_length=100),
+    max_distance: Optional[int] = Query(None, ge=0, le=MAX_DISTANCE),
+    limit: int = Query(10, ge=1, le=50),
+):
+    await word_suggestions.ensure_loaded()
+    return word_suggestions.similar(q, max_distance, limit)
 
 @router.get(
     "/{word_id}/examples",
@@ -45,9 +149,9 @@ def get_words(
     summary="Ejemplos de una palabra",
     description="Devuelve la lista de ejemplos de uso asociados a una palabra por su ID.",
 )
-def get_examples(word_id: int, db: Session = Depends(get_db)):
-    examples = db.query(models.WordExample).filter(models.WordExample.word_id == word_id).all()
-    return examples
+async def get_examples(word_id: int, db: AsyncSession = Depends(get_read_db)):
+    examples = await db.scalars(select(models.WordExample).where(models.WordExample.word_id == word_id))
+    return examples.all()
 
 @router.post(
     "/",
@@ -60,6 +164,8 @@ def create_word(
     db: Session = Depends(get_db),
     current_user: TokenPayload = Depends(ensure_user_in_db),
 ):
+    _check_words_unique(db, [word_data.word])
+
     # Crear la palabra
     new_word = models.Word(
         word=word_data.word,
@@ -79,9 +185,12 @@ def create_word(
     # Guardar en la BD
     db.add(new_word)
     db.commit()
-    db.refresh(new_word)
+    words_total.adjust(1)
+    # La identity key no está expirada: leer new_word.id tras el commit haría un SELECT.
+    word_id = inspect(new_word).identity[0]
+    word_suggestions.add(word_id, word_data.word)
 
-    return new_word
+    return _reload_words(db, [word_id])[0]
 
 @router.post(
     "/bulk",
@@ -94,30 +203,63 @@ def create_words_bulk(
     db: Session = Depends(get_db),
     current_user: TokenPayload = Depends(ensure_user_in_db),
 ):
-    created_words = []
+    _check_words_unique(db, [word_data.word for word_data in words_data])
 
-    for word_data in words_data:
-        new_word = models.Word(
-            word=word_data.word,
-            meaning=word_data.meaning,
-            is_active=word_data.is_active,
-        )
+    # Todas las categorías del lote en una sola consulta
+    all_ids = {cid for word_data in words_data for cid in word_data.category_ids}
+    found_ids = set(
+        db.scalars(select(models.Category.id).where(models.Category.id.in_(all_ids))).all()
+    ) if all_ids else set()
 
-        # Buscar las categorías por ID
-        categories = db.query(models.Category).filter(models.Category.id.in_(word_data.category_ids)).all()
-        if not categories:
+    rows, category_ids_by_key = [], {}
+    for word_data in words_data:
+        category_ids = [cid for cid in dict.fromkeys(word_data.category_ids) if cid in found_ids]
+        if not category_ids:
             raise HTTPException(status_code=400, detail=f"No se encontraron categorías para {word_data.word}")
+        key = fold(word_data.word)
+        rows.append({"word": word_data.word, "word_key": key, "meaning": word_data.meaning, "is_active": word_data.is_active})
+        category_ids_by_key[key] = category_ids
 
-        new_word.categories = categories
-        db.add(new_word)
-        created_words.append(new_word)
-
+    # Inserción por lotes (insertmanyvalues): RETURNING no garantiza el orden, así que los ids
+    # se asocian por la clave normalizada, única en el lote.
+    ids_by_key = dict(db.execute(insert(models.Word).returning(models.Word.word_key, models.Word.id), rows).all())
+    links = [
+        {"word_id": ids_by_key[key], "category_id": cid}
+        for key, category_ids in category_ids_by_key.items()
+        for cid in category_ids
+    ]
+    db.execute(insert(models.word_category), links)
     db.commit()
+    words_total.adjust(len(rows))
+    word_ids = [ids_by_key[row["word_key"]] for row in rows]
+    for word_id, row in zip(word_ids, rows):
+        word_suggestions.add(word_id, row["word"])
 
-    for word in created_words:
-        db.refresh(word)
+    return _reload_words(db, word_ids)
 
-    return created_words
+
+@router.post(
+    "/import",
+    response_model=WordImportResult,
+    summary="Importar palabras (NDJSON o CSV)",
+    description=(
+        "Importa palabras desde el cuerpo de la petición en streaming, en lotes. "
+        "Formato por `format` o por Content-Type (`text/csv` o NDJSON). "
+        "Las filas repetidas o inválidas se reportan sin abortar la importación. Requiere autenticación."
+    ),
+)
+async def import_words_stream(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: TokenPayload = Depends(ensure_user_in_db),
+):
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    parse = iter_csv if format == "csv" else iter_ndjson
+    result = await import_words(db, parse(request.stream()))
+    words_total.adjust(result.inserted)
+    return result
 
 
 @router.delete(
@@ -147,6 +289,8 @@ def delete_word(
         # Eliminar la palabra de la base de datos
         db.delete(word)
         db.commit()
+        words_total.adjust(-1)
+        word_suggestions.remove(word_id)
         
         return {
             "success": True,
@@ -179,6 +323,7 @@ def update_word(
     word = db.query(models.Word).filter(models.Word.id == word_id).first()
     if not word:
         raise HTTPException(status_code=404, detail=f"Palabra con ID {word_id} no encontrada")
+    _check_words_unique(db, [word_data.word], word_id)
 
     # Actualizar campos
     word.word = word_data.word
@@ -195,9 +340,9 @@ def update_word(
 
     # Guardar cambios
     db.commit()
-    db.refresh(word)
+    word_suggestions.add(word_id, word_data.word)
 
-    return word
+    return _reload_words(db, [word_id])[0]
 
 @router.post(
     "/{word_id}/examples",
@@ -211,7 +356,7 @@ def add_examples_to_word(
     db: Session = Depends(get_db),
     current_user: TokenPayload = Depends(ensure_user_in_db),
 ):
-    word = db.query(models.Word).options(joinedload(models.Word.examples)).filter(models.Word.id == word_id).first()
+    word = db.query(models.Word).filter(models.Word.id == word_id).first()
     if not word:
         raise HTTPException(status_code=404, detail=f"Palabra con ID {word_id} no encontrada")
 
@@ -222,8 +367,7 @@ def add_examples_to_word(
     )
     db.add(new_example)
     db.commit()
-    db.refresh(word)
-    return word
+    return _reload_words(db, [word_id])[0]
 
 
 @router.put(
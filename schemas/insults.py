@@ -100,6 +100,8 @@ class InsultComment(InsultCommentBase):
     starred_by_me: bool = False
     likes_count: int = 0
     liked_by_me: bool = False
+    # Respuestas directas; `replies` puede traer solo las primeras (ver GET /bad_words/{id}/comments).
+    replies_count: int = 0
     replies: list["InsultComment"] = []
 
     class Config:
@@ -0,0 +1,122 @@
+from pydantic import BaseModel
+from typing import Dict, Optional
+
+
+class JWKSStats(BaseModel):
+    """Estado del almacén de claves JWKS compartido."""
+    keys: int
+    fetch_count: int
+    fetch_errors: int
+    age_seconds: Optional[float] = None
+
+
+class TokenCacheStats(BaseModel):
+    """Aciertos/fallos de la caché de tokens verificados (por prefijo de ruta en by_path)."""
+    hits: int
+    misses: int
+    entries: int
+    bytes: int
+    evictions: int
+    by_path: Dict[str, Dict[str, int]] = {}
+
+
+class AuthVerifyStats(BaseModel):
+    """Pool de hilos que verifica tokens fuera del event loop."""
+    mode: str
+    max_workers: int
+    in_flight: int
+    waiting: int
+    completed: int
+    errors: int
+    timeouts: int
+    avg_wait_ms: float
+    avg_run_ms: float
+    max_run_ms: float
+
+
+class DBPoolStats(BaseModel):
+    """Pool de conexiones de SQLAlchemy: ocupación, espera en checkout y rotación de conexiones."""
+    size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    checkins: int
+    timeouts: int
+    connects: int
+    closes: int
+    invalidations: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class ReplicaStats(BaseModel):
+    """Réplica de lectura: salud, retraso y cuántas lecturas fueron a réplica o al primario."""
+    configured: bool
+    healthy: bool
+    lag_seconds: Optional[float] = None
+    last_error: Optional[str] = None
+    replica_reads: int
+    primary_fallbacks: int
+
+
+class StartupStats(BaseModel):
+    """Arranque del worker: duración de cada fase, listo, y latencia de la primera petición."""
+    phases_ms: Dict[str, float] = {}
+    ready_ms: Optional[float] = None
+    first_request_ms: Optional[float] = None
+    boot_to_first_response_ms: Optional[float] = None
+
+
+class SuggestIndexStats(BaseModel):
+    """Índice de autocompletado: términos, reconstrucciones (y fallidas) y antigüedad (None si aún no se cargó)."""
+    terms: int
+    rebuilds: int
+    rebuild_errors: int = 0
+    last_error: Optional[str] = None
+    last_build_ms: Optional[float] = None
+    age_seconds: Optional[float] = None
+
+
+class CounterBufferStats(BaseModel):
+    """Modo write-behind de contadores: votos registrados, flushes del journal y errores."""
+    enabled: bool
+    interval: float
+    recorded: int
+    unflushed: int
+    flushes: int
+    flushed_counters: int
+    skipped: int
+    errors: int
+    last_error: Optional[str] = None
+    last_flush_ms: Optional[float] = None
+
+
+class LiveEventsStats(BaseModel):
+    """Eventos en vivo (SSE): conexión LISTEN, suscriptores y eventos repartidos o descartados."""
+    enabled: bool
+    connected: bool
+    subscribers: int
+    insults: int
+    connections: int
+    received: int
+    delivered: int
+    dropped: int
+    last_error: Optional[str] = None
+
+
+class MetricsResponse(BaseModel):
+    """Métricas internas del proceso (un worker de uvicorn)."""
+    startup: StartupStats
+    jwks: JWKSStats
+    token_cache: TokenCacheStats
+    auth_verify: AuthVerifyStats
+    db_pool: DBPoolStats
+    db_async_pool: Optional[DBPoolStats] = None
+    replica: ReplicaStats
+    db_replica_pool: Optional[DBPoolStats] = None
+    word_suggestions: SuggestIndexStats
+    insult_suggestions: SuggestIndexStats
+    counter_buffer: CounterBufferStats
+    live_events: LiveEventsStats
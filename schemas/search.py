@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import List, Literal
+
+
+class SearchResult(BaseModel):
+    type: Literal["word", "insult"]
+    id: int
+    text: str
+    meaning: str
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    """Resultados ordenados por relevancia (paginados con skip/limit)."""
+    items: List[SearchResult]
+    skip: int
+    limit: int
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class Suggestion(BaseModel):
+    """Término que empieza por el prefijo buscado."""
+    id: int
+    text: str
+
+
+class SimilarTerm(BaseModel):
+    id: int
+    text: str
+    distance: int
+
+
+class SimilarResponse(BaseModel):
+    """
+    Términos parecidos, del más cercano al más lejano. `candidates` es cuántos términos pasaron
+    el filtro por trigramas y se compararon; `terms`, cuántos hay en el índice.
+    """
+    items: List[SimilarTerm]
+    max_distance: int
+    terms: int
+    candidates: int
+    matches: int
+    elapsed_ms: float
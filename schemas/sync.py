@@ -0,0 +1,67 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class SyncCategory(BaseModel):
+    id: int
+    name: str
+
+
+class SyncWord(BaseModel):
+    id: int
+    word: str
+    meaning: str
+    is_active: bool
+    category_ids: List[int] = []
+
+
+class SyncWordExample(BaseModel):
+    id: int
+    word_id: Optional[int] = None
+    text: str
+    is_active: bool
+
+
+class SyncInsultTag(BaseModel):
+    id: int
+    name: str
+
+
+class SyncInsult(BaseModel):
+    id: int
+    insult: str
+    meaning: str
+    is_active: bool
+    tag_id: Optional[int] = None
+
+
+class SyncInsultExample(BaseModel):
+    id: int
+    insult_id: Optional[int] = None
+    text: str
+    is_active: bool
+
+
+class SyncDeleted(BaseModel):
+    """Ids borrados desde `since`, por tabla."""
+    categories: List[int] = []
+    words: List[int] = []
+    word_examples: List[int] = []
+    insult_tags: List[int] = []
+    insults: List[int] = []
+    insult_examples: List[int] = []
+
+
+class SyncResponse(BaseModel):
+    """
+    Cambios desde `since`. El cliente guarda `version` y la envía como `since` en la
+    siguiente sincronización. El snapshot completo tiene el mismo formato (sin borrados).
+    """
+    version: int
+    categories: List[SyncCategory] = []
+    words: List[SyncWord] = []
+    word_examples: List[SyncWordExample] = []
+    insult_tags: List[SyncInsultTag] = []
+    insults: List[SyncInsult] = []
+    insult_examples: List[SyncInsultExample] = []
+    deleted: SyncDeleted = SyncDeleted()
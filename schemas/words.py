@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from .categories import Category
 
 
@@ -9,6 +9,8 @@ class WordPaginated(BaseModel):
     total: int
     skip: int
     limit: int
+    # Valor para `after` en la página siguiente; None en la última página.
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -21,6 +23,22 @@ class WordDeleteResponse(BaseModel):
     deleted_word_id: int
 
 
+class WordImportRejected(BaseModel):
+    """Fila del archivo que no se importó."""
+    line: int
+    word: Optional[str] = None
+    error: str
+
+
+class WordImportResult(BaseModel):
+    """Resultado de POST /words/import."""
+    received: int = 0
+    inserted: int = 0
+    rejected_total: int = 0
+    # Detalle de las primeras filas rechazadas (ver word_import.MAX_REPORTED_REJECTIONS).
+    rejected: List[WordImportRejected] = []
+
+
 class WordExampleBase(BaseModel):
     text: str
     is_active: bool = False
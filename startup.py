@@ -0,0 +1,58 @@
+import time
+from typing import Dict, Optional
+
+# Se importa lo primero en main.py: este instante es el inicio del arranque del worker.
+_BOOT_STARTED = time.perf_counter()
+
+
+class StartupReport:
+    """Tiempos del arranque de un worker: fases de import, init del engine y primera petición."""
+
+    def __init__(self):
+        self._last = _BOOT_STARTED
+        self.phases_ms: Dict[str, float] = {}
+        self.ready_ms: Optional[float] = None
+        self.first_request_ms: Optional[float] = None
+        self.boot_to_first_response_ms: Optional[float] = None
+
+    def mark(self, phase: str) -> None:
+        """Cierra la fase `phase` (tiempo desde la marca anterior)."""
+        now = time.perf_counter()
+        self.phases_ms[phase] = round((now - self._last) * 1000, 3)
+        self._last = now
+
+    def ready(self) -> None:
+        self.ready_ms = round((time.perf_counter() - _BOOT_STARTED) * 1000, 3)
+        phases = ", ".join(f"{k}={v:.0f}ms" for k, v in self.phases_ms.items())
+        print(f"[startup] listo en {self.ready_ms:.0f}ms ({phases})")
+
+    def stats(self) -> dict:
+        return {
+            "phases_ms": dict(self.phases_ms),
+            "ready_ms": self.ready_ms,
+            "first_request_ms": self.first_request_ms,
+            "boot_to_first_response_ms": self.boot_to_first_response_ms,
+        }
+
+
+startup_report = StartupReport()
+
+
+class FirstRequestTimer:
+    """Middleware ASGI que mide solo la primera petición HTTP; después es un passthrough."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or startup_report.first_request_ms is not None:
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            now = time.perf_counter()
+            if startup_report.first_request_ms is None:
+                startup_report.first_request_ms = round((now - started) * 1000, 3)
+                startup_report.boot_to_first_response_ms = round((now - _BOOT_STARTED) * 1000, 3)
+                print(f"[startup] primera petición {scope['path']} en {startup_report.first_request_ms:.0f}ms")
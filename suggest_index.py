@@ -0,0 +1,255 @@
+"""
+Índice de términos en memoria para el autocompletado (GET /words/suggest, GET /bad_words/suggest)
+y el "quizás quisiste decir" (GET /words/similar, GET /bad_words/similar).
+
+Cada término se guarda plegado (sin tildes ni mayúsculas, ver normalize.fold); al construirlo
+se usa la columna *_key de la tabla.
+
+- Prefijos: lista ordenada de (término plegado, id); una búsqueda es un bisect al primer
+  término >= prefijo y un recorrido mientras coincida, O(log n + k). Frente a un trie ocupa
+  mucha menos memoria en Python (una tupla por término en vez de un dict por carácter).
+- Parecidos: índice invertido de trigramas, como pg_trgm. Con distancia de edición k, el
+  término buscado comparte al menos (sus trigramas - 3k) trigramas con cualquier término a
+  esa distancia (cada edición rompe como mucho 3). Solo los términos que llegan a ese mínimo
+  son candidatos, y solo con ellos se calcula la distancia (Levenshtein).
+
+- Se construye desde la BD en la primera búsqueda del worker (no en el arranque).
+- Las rutas de escritura lo actualizan tras cada commit (`add` / `remove`).
+- Los cambios hechos por otros workers se recogen al reconstruirlo cada `ttl` segundos,
+  en segundo plano; mientras tanto se sigue respondiendo con el índice actual.
+"""
+import asyncio
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import anyio
+from sqlalchemy import select
+
+from config import settings
+from database import AsyncSessionLocal, get_read_engine
+from normalize import fold
+import models
+
+# Filas (id, término, término plegado)
+Loader = Callable[[], Awaitable[Iterable[Tuple[int, str, str]]]]
+
+# Distancia de edición máxima para /similar.
+MAX_DISTANCE = 2
+
+
+def trigrams(folded: str) -> Set[str]:
+    # Con relleno (como pg_trgm) el principio y el final de la palabra también cuentan.
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def auto_distance(folded: str) -> int:
+    """Distancia por defecto según la longitud: 0 hasta 2 letras, 1 hasta 5, 2 desde 6."""
+    return 0 if len(folded) <= 2 else 1 if len(folded) <= 5 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein; deja de calcular en cuanto supera `limit` (devuelve limit + 1)."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _build(rows: Iterable[Tuple[int, str, str]]):
+    texts, folded = {}, {}
+    for row_id, term, key in rows:
+        texts[row_id], folded[row_id] = term, key
+    keys = sorted((key, row_id) for row_id, key in folded.items())
+    postings = defaultdict(list)
+    for row_id, key in folded.items():
+        for gram in trigrams(key):
+            postings[gram].append(row_id)
+    return keys, texts, folded, postings
+
+
+class TermIndex:
+    def __init__(self, loader: Loader, ttl: float):
+        self._loader = loader
+        self.ttl = ttl
+        self._keys: List[Tuple[str, int]] = []  # (término plegado, id), ordenada
+        self._texts: Dict[int, str] = {}  # id -> término original
+        self._folded: Dict[int, str] = {}  # id -> término plegado
+        self._postings: Dict[str, List[int]] = defaultdict(list)  # trigrama -> ids
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+        # Escrituras que llegan mientras se reconstruye: se reaplican sobre el índice nuevo.
+        self._pending: Optional[List[Tuple[int, Optional[str]]]] = None
+        self.rebuilds = 0
+        self.rebuild_errors = 0
+        self.last_error: Optional[str] = None
+        self.last_build_ms: Optional[float] = None
+
+    # ----- Construcción -----
+    async def ensure_loaded(self) -> None:
+        if self._loaded_at is None:
+            # Todas las peticiones que llegan con el índice vacío esperan la misma carga
+            # (shield: si una se cancela, la carga sigue para las demás).
+            await asyncio.shield(self._start_rebuild())
+        elif time.monotonic() - self._loaded_at > self.ttl:
+            self._start_rebuild()
+
+    def _start_rebuild(self) -> asyncio.Task:
+        """La reconstrucción en curso, o una nueva si no hay (una sola a la vez)."""
+        task = self._rebuild_task
+        # Una tarea de otro event loop (p. ej. uno ya cerrado) no cuenta.
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._rebuild_task = asyncio.create_task(self._rebuild())
+            task.add_done_callback(self._rebuild_done)
+        return task
+
+    def _rebuild_done(self, task: asyncio.Task) -> None:
+        # Recoge el error también de los refrescos en segundo plano, que nadie espera.
+        # Se sigue respondiendo con el índice anterior y se reintenta en la próxima búsqueda.
+        if task.cancelled() or task.exception() is None:
+            return
+        self.rebuild_errors += 1
+        self.last_error = str(task.exception())[:200]
+        print(f"[suggest] Error al reconstruir el índice: {self.last_error}")
+
+    async def _rebuild(self) -> None:
+        started = time.perf_counter()
+        pending: List[Tuple[int, Optional[str]]] = []
+        with self._lock:
+            self._pending = pending
+        try:
+            rows = await self._loader()
+            # Con muchos términos la construcción tarda segundos: fuera del event loop.
+            keys, texts, folded, postings = await anyio.to_thread.run_sync(_build, rows)
+            with self._lock:
+                self._keys, self._texts, self._folded, self._postings = keys, texts, folded, postings
+                for row_id, term in pending:
+                    self._apply(row_id, term)
+                self._loaded_at = time.monotonic()
+            self.rebuilds += 1
+            self.last_build_ms = round((time.perf_counter() - started) * 1000, 3)
+        finally:
+            with self._lock:
+                if self._pending is pending:
+                    self._pending = None
+
+    # ----- Escrituras -----
+    def _apply(self, row_id: int, term: Optional[str]) -> None:
+        self._texts.pop(row_id, None)
+        old = self._folded.pop(row_id, None)
+        if old is not None:
+            i = bisect_left(self._keys, (old, row_id))
+            if i < len(self._keys) and self._keys[i] == (old, row_id):
+                del self._keys[i]
+            for gram in trigrams(old):
+                self._postings[gram].remove(row_id)
+        if term is not None:
+            key = fold(term)
+            self._texts[row_id], self._folded[row_id] = term, key
+            insort(self._keys, (key, row_id))
+            for gram in trigrams(key):
+                self._postings[gram].append(row_id)
+
+    def add(self, row_id: int, term: str) -> None:
+        """Alta o cambio de texto de un término (tras el commit)."""
+        self._write(row_id, term)
+
+    def remove(self, row_id: int) -> None:
+        self._write(row_id, None)
+
+    def _write(self, row_id: int, term: Optional[str]) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((row_id, term))
+            if self._loaded_at is not None:
+                self._apply(row_id, term)
+
+    # ----- Lectura -----
+    def lookup(self, prefix: str, limit: int = 10) -> List[Tuple[int, str]]:
+        folded = fold(prefix)
+        out = []
+        with self._lock:
+            i = bisect_left(self._keys, (folded,))
+            while i < len(self._keys) and len(out) < limit:
+                key, row_id = self._keys[i]
+                if not key.startswith(folded):
+                    break
+                out.append((row_id, self._texts[row_id]))
+                i += 1
+        return out
+
+    def similar(self, query: str, max_distance: Optional[int] = None, limit: int = 10) -> dict:
+        """
+        Términos a distancia de edición <= max_distance (por defecto según la longitud),
+        ordenados por distancia y texto. Devuelve también la distancia usada (se reduce si
+        la consulta es tan corta que el filtro por trigramas no descartaría nada) y cuántos
+        candidatos hubo que comparar (dict con el formato de SimilarResponse).
+        """
+        started = time.perf_counter()
+        folded = fold(query)
+        grams = trigrams(folded)
+        distance = auto_distance(folded) if max_distance is None else max_distance
+        distance = max(0, min(distance, MAX_DISTANCE, (len(grams) - 1) // 3))
+        needed = len(grams) - 3 * distance
+        shared = Counter()
+        with self._lock:
+            for gram in grams:
+                ids = self._postings.get(gram)
+                if ids:
+                    shared.update(ids)
+            candidates = [(row_id, self._folded[row_id]) for row_id, n in shared.items() if n >= needed]
+            matches = []
+            for row_id, key in candidates:
+                d = edit_distance(folded, key, distance)
+                if d <= distance:
+                    matches.append((d, key, row_id, self._texts[row_id]))
+            terms = len(self._keys)
+        matches.sort()
+        return {
+            "items": [{"id": row_id, "text": text, "distance": d} for d, _, row_id, text in matches[:limit]],
+            "max_distance": distance,
+            "terms": terms,
+            "candidates": len(candidates),
+            "matches": len(matches),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "terms": len(self._keys),
+            "rebuilds": self.rebuilds,
+            "rebuild_errors": self.rebuild_errors,
+            "last_error": self.last_error,
+            "last_build_ms": self.last_build_ms,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+        }
+
+
+# ----- Índices de la app -----
+def _table_loader(*columns) -> Loader:
+    async def load():
+        async with AsyncSessionLocal(bind=await get_read_engine()) as db:
+            return (await db.execute(select(*columns))).all()
+    return load
+
+
+# La clave normalizada ya viene de la BD (misma normalize.fold): no se repliega al reconstruir.
+word_suggestions = TermIndex(
+    _table_loader(models.Word.id, models.Word.word, models.Word.word_key), settings.suggest_index_ttl
+)
+insult_suggestions = TermIndex(
+    _table_loader(models.Insult.id, models.Insult.insult, models.Insult.insult_key), settings.suggest_index_ttl
+)
@@ -0,0 +1,173 @@
+"""
+Versiones de cambio para la sincronización offline de la app móvil (GET /sync).
+
+Cada fila sincronizable lleva `sync_version`: el id de la transacción (txid) que la
+creó o modificó por última vez, fijado por un trigger. Los borrados dejan una fila en
+`sync_tombstones` con el txid del borrado. Cambiar las categorías de una palabra
+(word_category) también cambia la versión de la palabra.
+
+La marca de agua que se devuelve al cliente es el xmin del snapshot actual: todas las
+transacciones con txid menor ya terminaron, así que ninguna fila con versión menor
+puede aparecer después. Con `since <= sync_version < xmin` no se pierden cambios de
+transacciones lentas que hacen commit más tarde que otras más nuevas.
+
+Solo funciona en PostgreSQL (triggers y funciones txid_*).
+
+Snapshot completo precalculado (para la primera instalación):
+
+    python sync_versions.py
+"""
+import asyncio
+import gzip
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import anyio
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import Base
+import models
+
+# Tabla -> (modelo, columnas que se envían, columnas cuyo cambio sube la versión)
+SYNC_TABLES: Dict[str, Tuple[type, List[str], List[str]]] = {
+    "categories": (models.Category, ["id", "name"], ["name"]),
+    "words": (models.Word, ["id", "word", "meaning", "is_active"], ["word", "meaning", "is_active"]),
+    "word_examples": (models.WordExample, ["id", "word_id", "text", "is_active"], ["word_id", "text", "is_active"]),
+    "insult_tags": (models.InsultTag, ["id", "name"], ["name"]),
+    # Los contadores no suben la versión: cambian con cada estrellita y no se sincronizan.
+    "insults": (models.Insult, ["id", "insult", "meaning", "is_active", "tag_id"], ["insult", "meaning", "is_active", "tag_id"]),
+    "insult_examples": (models.InsultExample, ["id", "insult_id", "text", "is_active"], ["insult_id", "text", "is_active"]),
+}
+
+_FUNCTIONS_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION sync_touch() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.sync_version := txid_current();
+        RETURN NEW;
+    END $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION sync_tombstone() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO sync_tombstones (table_name, row_id, sync_version)
+        VALUES (TG_TABLE_NAME, OLD.id, txid_current());
+        RETURN OLD;
+    END $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION sync_touch_word_category() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE words SET sync_version = txid_current()
+        WHERE id = CASE WHEN TG_OP = 'DELETE' THEN OLD.word_id ELSE NEW.word_id END;
+        RETURN NULL;
+    END $$
+    """,
+]
+
+
+def trigger_ddl() -> List[str]:
+    """Sentencias que instalan funciones y triggers (create_all y la migración usan las mismas)."""
+    statements = list(_FUNCTIONS_SQL)
+    for table, (_, _, touch_columns) in SYNC_TABLES.items():
+        statements += [
+            f"DROP TRIGGER IF EXISTS {table}_sync_touch ON {table}",
+            f"CREATE TRIGGER {table}_sync_touch BEFORE INSERT OR UPDATE OF {', '.join(touch_columns)} "
+            f"ON {table} FOR EACH ROW EXECUTE FUNCTION sync_touch()",
+            f"DROP TRIGGER IF EXISTS {table}_sync_tombstone ON {table}",
+            f"CREATE TRIGGER {table}_sync_tombstone AFTER DELETE "
+            f"ON {table} FOR EACH ROW EXECUTE FUNCTION sync_tombstone()",
+        ]
+    statements += [
+        "DROP TRIGGER IF EXISTS word_category_sync_touch ON word_category",
+        "CREATE TRIGGER word_category_sync_touch AFTER INSERT OR DELETE "
+        "ON word_category FOR EACH ROW EXECUTE FUNCTION sync_touch_word_category()",
+    ]
+    return statements
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_triggers(target, connection, **kw):
+    # Con DB_CREATE_ALL=true en PostgreSQL la BD nueva queda igual que tras las migraciones.
+    if connection.dialect.name == "postgresql":
+        for statement in trigger_ddl():
+            connection.execute(text(statement))
+
+
+# ----- Lectura de cambios -----
+_WATERMARK_SQL = text("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+
+
+async def collect_changes(db: AsyncSession, since: int) -> dict:
+    """Filas cambiadas y borradas con `since <= versión < marca de agua` (dict con el formato de SyncResponse)."""
+    version = await db.scalar(_WATERMARK_SQL)
+    out = {"version": version, "deleted": defaultdict(list)}
+    for table, (model, columns, _) in SYNC_TABLES.items():
+        rows = await db.execute(
+            select(*(getattr(model, c) for c in columns))
+            .where(model.sync_version >= since, model.sync_version < version)
+            .order_by(model.id)
+        )
+        out[table] = [dict(r._mapping) for r in rows]
+
+    if out["words"]:
+        links = await db.execute(
+            select(models.word_category.c.word_id, models.word_category.c.category_id)
+            .where(models.word_category.c.word_id.in_([w["id"] for w in out["words"]]))
+        )
+        category_ids = defaultdict(list)
+        for word_id, category_id in links:
+            category_ids[word_id].append(category_id)
+        for w in out["words"]:
+            w["category_ids"] = sorted(category_ids[w["id"]])
+
+    if since > 0:
+        tombstones = await db.execute(
+            select(models.SyncTombstone.table_name, models.SyncTombstone.row_id).where(
+                models.SyncTombstone.sync_version >= since,
+                models.SyncTombstone.sync_version < version,
+            )
+        )
+        for table, row_id in tombstones:
+            out["deleted"][table].append(row_id)
+    out["deleted"] = dict(out["deleted"])
+    return out
+
+
+# ----- Snapshot completo -----
+def snapshot_is_fresh(path: str, max_age: float) -> bool:
+    try:
+        return time.time() - os.path.getmtime(path) < max_age
+    except OSError:
+        return False
+
+
+def _write_snapshot(path: str, data: dict) -> None:
+    # Se escribe aparte y se renombra: los workers nunca sirven un archivo a medias.
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+async def build_snapshot(db: AsyncSession, path: str) -> int:
+    """Escribe en `path` el JSON gzip de todas las filas; devuelve su versión."""
+    data = await collect_changes(db, since=0)
+    await anyio.to_thread.run_sync(_write_snapshot, path, data)
+    return data["version"]
+
+
+if __name__ == "__main__":
+    from config import settings
+    from database import AsyncSessionLocal, get_async_engine
+
+    async def _main():
+        async with AsyncSessionLocal(bind=get_async_engine()) as db:
+            version = await build_snapshot(db, settings.sync_snapshot_path)
+        print(f"Snapshot v{version} escrito en {settings.sync_snapshot_path}")
+
+    asyncio.run(_main())
@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# Los módulos de la app están en la raíz del repo y leen la configuración al importarse.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'arrechoteca_test.db')}")
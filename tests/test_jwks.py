@@ -0,0 +1,134 @@
+"""JWKSKeyStore contra un servidor JWKS local (http.server)."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+from jwt.algorithms import ECAlgorithm
+from jwt.exceptions import PyJWKClientError
+
+from auth.jwks import JWKSKeyStore
+
+
+def _jwk(kid: str) -> dict:
+    key = ECAlgorithm.to_jwk(ec.generate_private_key(ec.SECP256R1()).public_key(), as_dict=True)
+    return {**key, "kid": kid, "alg": "ES256", "use": "sig"}
+
+
+class JWKSServer:
+    """Sirve `keys` como JWKS y cuenta las descargas; `delay` alarga cada respuesta."""
+
+    def __init__(self, *kids: str, delay: float = 0):
+        self.keys = [_jwk(kid) for kid in kids]
+        self.delay = delay
+        self.hits = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.hits += 1
+                time.sleep(server.delay)
+                body = json.dumps({"keys": server.keys}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_port}/auth/v1/.well-known/jwks.json"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def rotate(self, *kids: str) -> None:
+        self.keys = [_jwk(kid) for kid in kids]
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def jwks_server():
+    server = JWKSServer("k1", delay=0.2)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def make_store():
+    stores = []
+
+    def make(url, **kwargs):
+        store = JWKSKeyStore(url, **kwargs)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.stop()
+
+
+def test_unknown_kid_is_fetched_once_for_concurrent_callers(jwks_server, make_store):
+    store = make_store(jwks_server.url)
+    barrier = threading.Barrier(20)
+    found, errors = [], []
+
+    def worker():
+        barrier.wait()
+        try:
+            found.append(store.get_signing_key("k1").key_id)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert found == ["k1"] * 20
+    assert jwks_server.hits == 1
+    assert store.fetch_count == 1
+
+
+def test_unknown_kid_refetch_is_rate_limited(jwks_server, make_store):
+    store = make_store(jwks_server.url, min_refetch_interval=0.5)
+    store.get_signing_key("k1")
+    for _ in range(5):
+        with pytest.raises(PyJWKClientError):
+            store.get_signing_key("inventado")
+    assert jwks_server.hits == 1
+
+    # Pasado el intervalo, un `kid` desconocido vuelve a descargar (una sola vez).
+    time.sleep(0.6)
+    jwks_server.rotate("k1", "k2")
+    assert store.get_signing_key("k2").key_id == "k2"
+    with pytest.raises(PyJWKClientError):
+        store.get_signing_key("inventado")
+    assert jwks_server.hits == 2
+
+
+def test_background_refresh_picks_up_rotated_key(jwks_server, make_store):
+    jwks_server.delay = 0
+    store = make_store(jwks_server.url, ttl=0.2, min_refetch_interval=60)
+    store.get_signing_key("k1")
+    jwks_server.rotate("k2")
+
+    deadline = time.monotonic() + 5
+    while "k2" not in store._keys and time.monotonic() < deadline:
+        time.sleep(0.05)
+    store.stop()
+    store._refresher.join(timeout=1)
+    hits = jwks_server.hits
+
+    # La clave nueva ya está en el almacén: no hace falta una descarga en la petición.
+    assert store.get_signing_key("k2").key_id == "k2"
+    assert jwks_server.hits == hits
+    with pytest.raises(PyJWKClientError):
+        store.get_signing_key("k1")
@@ -0,0 +1,91 @@
+"""Carga del índice de autocompletado con muchas peticiones a la vez."""
+import asyncio
+
+import pytest
+
+from normalize import fold
+from suggest_index import TermIndex
+
+TERMS = ["chuchaqui", "bacán", "ñaño", "mijín"]
+
+
+class Loader:
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        if self.fail:
+            raise RuntimeError("BD caída")
+        return [(i, term, fold(term)) for i, term in enumerate(TERMS, 1)]
+
+
+def test_cold_index_is_loaded_once_for_concurrent_requests():
+    loader = Loader()
+    index = TermIndex(loader, ttl=300)
+
+    async def main():
+        waiters = [asyncio.create_task(index.ensure_loaded()) for _ in range(20)]
+        await asyncio.sleep(0.01)
+        # Una escritura durante la carga se aplica sobre el índice nuevo.
+        index.add(99, "Chévere")
+        await asyncio.gather(*waiters)
+
+    asyncio.run(main())
+    assert loader.calls == 1
+    assert index.lookup("nan") == [(3, "ñaño")]
+    assert index.lookup("che") == [(99, "Chévere")]
+    assert index.stats()["terms"] == len(TERMS) + 1
+
+
+def test_failed_load_reaches_every_waiter_and_is_retried():
+    loader = Loader(fail=True)
+    index = TermIndex(loader, ttl=300)
+
+    async def main():
+        results = await asyncio.gather(*(index.ensure_loaded() for _ in range(10)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        loader.fail = False
+        await index.ensure_loaded()
+
+    asyncio.run(main())
+    assert loader.calls == 2
+    assert index.lookup("ba") == [(2, "bacán")]
+    assert index.stats()["rebuild_errors"] == 1
+
+
+def test_failed_background_refresh_is_recorded_and_keeps_the_index():
+    loader = Loader()
+    index = TermIndex(loader, ttl=0)
+
+    async def main():
+        await index.ensure_loaded()
+        loader.fail = True
+        await index.ensure_loaded()  # caducado: refresco en segundo plano
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert loader.calls == 2
+    assert index.stats()["rebuild_errors"] == 1
+    assert index.stats()["last_error"] == "BD caída"
+    assert index.lookup("chu") == [(1, "chuchaqui")]
+
+
+def test_cancelled_waiter_does_not_cancel_the_load():
+    loader = Loader()
+    index = TermIndex(loader, ttl=300)
+
+    async def main():
+        first = asyncio.create_task(index.ensure_loaded())
+        second = asyncio.create_task(index.ensure_loaded())
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(main())
+    assert loader.calls == 1
+    assert index.stats()["terms"] == len(TERMS)
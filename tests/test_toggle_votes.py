@@ -0,0 +1,96 @@
+"""
+Toggles concurrentes de estrellitas y likes (_toggle_vote) en PostgreSQL: el contador
+desnormalizado debe acabar igual al número de filas de votos, también cuando el mismo
+usuario toca varias veces a la vez. Necesita TEST_POSTGRES_URL.
+"""
+import os
+import random
+import threading
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+import models
+from routers.insults import _toggle_vote
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+SCHEMA = "test_toggle_votes"
+TABLES = [
+    models.InsultTag.__table__,
+    models.User.__table__,
+    models.Insult.__table__,
+    models.InsultComment.__table__,
+    models.InsultStar.__table__,
+    models.CommentStar.__table__,
+    models.CommentLike.__table__,
+]
+USERS = 30
+
+pytestmark = pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL no configurada")
+
+# (tabla de votos, FK al padre, contador del padre)
+VOTES = [
+    pytest.param(models.InsultStar, models.InsultStar.insult_id, models.Insult.star_count, id="insult_stars"),
+    pytest.param(models.CommentStar, models.CommentStar.comment_id, models.InsultComment.star_count, id="comment_stars"),
+    pytest.param(models.CommentLike, models.CommentLike.comment_id, models.InsultComment.likes_count, id="comment_likes"),
+]
+
+
+@pytest.fixture
+def engine():
+    # Esquema propio (search_path): no toca las tablas de la BD.
+    engine = create_engine(
+        POSTGRES_URL, pool_size=USERS, max_overflow=10, connect_args={"options": f"-csearch_path={SCHEMA}"}
+    )
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        for table in TABLES:
+            table.create(conn)
+        conn.execute(insert(models.User), [{"id": f"u{i}", "email": f"u{i}@example.com"} for i in range(USERS)])
+        conn.execute(insert(models.Insult), [{"id": 1, "insult": "chucha", "insult_key": "chucha", "meaning": "m"}])
+        conn.execute(insert(models.InsultComment), [{"id": 1, "insult_id": 1, "user_id": "u0", "comment": "c"}])
+    yield engine
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    engine.dispose()
+
+
+def _run(threads):
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+@pytest.mark.parametrize("vote, parent_key, counter", VOTES)
+def test_concurrent_toggles_keep_counter_equal_to_rows(engine, vote, parent_key, counter):
+    Session = sessionmaker(bind=engine)
+    errors = []
+
+    def tap(user_id: str, times: int):
+        for _ in range(times):
+            db = Session()
+            try:
+                assert _toggle_vote(db, vote, parent_key, counter, 1, user_id) is not None
+            except Exception as e:
+                errors.append(repr(e))
+                db.rollback()
+            finally:
+                db.close()
+
+    # Usuarios distintos a la vez: con un número impar de toques el voto queda puesto.
+    rng = random.Random(7)
+    taps = {f"u{i}": rng.randint(1, 12) for i in range(1, USERS)}
+    _run([threading.Thread(target=tap, args=(user_id, n)) for user_id, n in taps.items()])
+    # El mismo usuario desde varios hilos a la vez (doble toque, varias pestañas).
+    _run([threading.Thread(target=tap, args=("u0", 15)) for _ in range(8)])
+
+    with engine.connect() as conn:
+        rows = conn.scalar(select(func.count()).select_from(vote).where(parent_key == 1))
+        others = conn.scalar(select(func.count()).select_from(vote).where(parent_key == 1, vote.user_id != "u0"))
+        value = conn.scalar(select(counter).where(counter.class_.id == 1))
+    assert errors == []
+    assert value == rows
+    assert others == sum(n % 2 for n in taps.values())
@@ -0,0 +1,80 @@
+"""
+Número de sentencias SQL de las rutas de escritura de /words: fijo, sin importar cuántas
+palabras, categorías o ejemplos haya (sin lazy loads por palabra al serializar).
+"""
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import models
+from routers import words
+from schemas.user import TokenPayload
+from schemas.words import Word, WordCreate, WordExampleBase
+
+USER = TokenPayload(sub="u1", email="u1@example.com", exp=0, iat=0)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'words.db'}")
+    models.Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(models.Category(name=f"cat{i}") for i in range(100))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _count_statements(db, call) -> int:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = call()
+        # Serializar como la respuesta: cualquier lazy load contaría aquí.
+        for word in result if isinstance(result, list) else [result]:
+            Word.model_validate(word)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return len(statements)
+
+
+def _new_word(db, word: str, n_categories: int, n_examples: int = 0) -> int:
+    created = words.create_word(WordCreate(word=word, meaning="m", category_ids=list(range(1, n_categories + 1))), db, USER)
+    for i in range(n_examples):
+        db.add(models.WordExample(text=f"ejemplo {i}", word_id=created.id))
+    db.commit()
+    db.expire_all()
+    return created.id
+
+
+@pytest.mark.parametrize("n", [1, 50])
+def test_create_word(db, n):
+    data = WordCreate(word="chuchaqui", meaning="resaca", category_ids=list(range(1, n + 1)))
+    assert _count_statements(db, lambda: words.create_word(data, db, USER)) == 7
+
+
+@pytest.mark.parametrize("n", [1, 50])
+def test_create_words_bulk(db, n):
+    data = [WordCreate(word=f"palabra{i}", meaning="m", category_ids=[1, 2]) for i in range(n)]
+    assert _count_statements(db, lambda: words.create_words_bulk(data, db, USER)) == 7
+
+
+@pytest.mark.parametrize("n", [1, 50])
+def test_update_word(db, n):
+    word_id = _new_word(db, "bacán", n, n_examples=n)
+    # Cambia todas las categorías: se borran n enlaces y se insertan n.
+    data = WordCreate(word="bacan", meaning="chévere", category_ids=list(range(51, 51 + n)))
+    assert _count_statements(db, lambda: words.update_word(word_id, data, db, USER)) == 10
+
+
+@pytest.mark.parametrize("n", [1, 50])
+def test_add_examples_to_word(db, n):
+    word_id = _new_word(db, "ñaño", n, n_examples=n)
+    data = WordExampleBase(text="Mi ñaño vive en Durán.")
+    assert _count_statements(db, lambda: words.add_examples_to_word(word_id, data, db, USER)) == 5
@@ -0,0 +1,111 @@
+"""
+Búsqueda de texto completo (GET /search) sobre palabras, insultos y sus ejemplos.
+
+Cada tabla tiene una columna generada `search_vector` (tsvector) con índice GIN, calculada
+con la configuración `spanish_unaccent`: la de español con `unaccent` delante del stemmer,
+así "pendejo", "pendejos" y "péndejo" coinciden. El texto de la palabra/insulto pesa más
+(A) que el significado (B); un acierto en un ejemplo suma al resultado de su palabra o
+insulto con la mitad de peso.
+
+Las columnas no están mapeadas en models.py (no hay tsvector fuera de PostgreSQL):
+las crean la migración o, con DB_CREATE_ALL=true, el hook de este módulo.
+"""
+from typing import List, Optional
+
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import Base
+
+SEARCH_CONFIG = "spanish_unaccent"
+
+_CONFIG_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    f"""
+    DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{SEARCH_CONFIG}') THEN
+            CREATE TEXT SEARCH CONFIGURATION {SEARCH_CONFIG} (COPY = spanish);
+            ALTER TEXT SEARCH CONFIGURATION {SEARCH_CONFIG}
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+        END IF;
+    END $$
+    """,
+]
+
+# Tabla -> expresión del tsvector
+SEARCH_VECTORS = {
+    "words": (
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(word, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(meaning, '')), 'B')"
+    ),
+    "insults": (
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(insult, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(meaning, '')), 'B')"
+    ),
+    "word_examples": f"to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(text, ''))",
+    "insult_examples": f"to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(text, ''))",
+}
+
+
+def search_ddl() -> List[str]:
+    statements = list(_CONFIG_DDL)
+    for table, expression in SEARCH_VECTORS.items():
+        statements += [
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({expression}) STORED",
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING gin (search_vector)",
+        ]
+    return statements
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_search_columns(target, connection, **kw):
+    if connection.dialect.name == "postgresql":
+        for statement in search_ddl():
+            connection.execute(text(statement))
+
+
+# Aciertos por tabla (cada rama usa su índice GIN), agrupados por palabra/insulto.
+_SEARCH_SQL = text(
+    f"""
+    WITH q AS (SELECT websearch_to_tsquery('{SEARCH_CONFIG}', :q) AS query),
+    hits AS (
+        SELECT 'word' AS type, w.id, ts_rank(w.search_vector, q.query) AS rank
+        FROM words w, q WHERE :words AND w.search_vector @@ q.query
+        UNION ALL
+        SELECT 'word', e.word_id, ts_rank(e.search_vector, q.query) * 0.5
+        FROM word_examples e, q WHERE :words AND e.word_id IS NOT NULL AND e.search_vector @@ q.query
+        UNION ALL
+        SELECT 'insult', i.id, ts_rank(i.search_vector, q.query)
+        FROM insults i, q WHERE :insults AND i.search_vector @@ q.query
+        UNION ALL
+        SELECT 'insult', e.insult_id, ts_rank(e.search_vector, q.query) * 0.5
+        FROM insult_examples e, q WHERE :insults AND e.insult_id IS NOT NULL AND e.search_vector @@ q.query
+    ),
+    ranked AS (
+        SELECT type, id, sum(rank) AS rank FROM hits
+        GROUP BY type, id
+        ORDER BY rank DESC, type, id
+        LIMIT :limit OFFSET :skip
+    )
+    SELECT r.type, r.id, coalesce(w.word, i.insult) AS text, coalesce(w.meaning, i.meaning) AS meaning, r.rank
+    FROM ranked r
+    LEFT JOIN words w ON r.type = 'word' AND w.id = r.id
+    LEFT JOIN insults i ON r.type = 'insult' AND i.id = r.id
+    ORDER BY r.rank DESC, r.type, r.id
+    """
+).bindparams(bindparam("words"), bindparam("insults"))
+
+
+async def search(db: AsyncSession, q: str, type: Optional[str], skip: int, limit: int) -> List[dict]:
+    rows = await db.execute(
+        _SEARCH_SQL,
+        {
+            "q": q,
+            "words": type in (None, "word"),
+            "insults": type in (None, "insult"),
+            "skip": skip,
+            "limit": limit,
+        },
+    )
+    return [dict(r._mapping) for r in rows]
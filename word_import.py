@@ -0,0 +1,170 @@
+"""
+Importación masiva de palabras desde un upload NDJSON o CSV en streaming.
+
+- El cuerpo se lee por trozos: la memoria no depende del tamaño del archivo.
+- Las categorías se resuelven una vez al empezar (una consulta).
+- Las palabras y sus enlaces a categorías se insertan en lotes de `IMPORT_BATCH_SIZE`
+  filas con INSERT multi-fila; cada lote es una transacción corta.
+- Una palabra repetida (en la BD o en el propio archivo) se reporta y no aborta el lote.
+
+Formato NDJSON, una palabra por línea:
+    {"word": "chendo", "meaning": "...", "category_ids": [1, 2], "is_active": true}
+
+Formato CSV, con cabecera; `category_ids` separados por `|`:
+    word,meaning,category_ids,is_active
+    chendo,...,1|2,true
+"""
+import codecs
+import csv
+import json
+from typing import AsyncIterator, List, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from normalize import fold
+from suggest_index import word_suggestions
+from schemas.words import WordCreate, WordImportRejected, WordImportResult
+import models
+
+IMPORT_BATCH_SIZE = 500
+# Máximo de filas rechazadas que se detallan en la respuesta (el total siempre se cuenta).
+MAX_REPORTED_REJECTIONS = 1000
+
+# (número de línea, datos de la fila o mensaje de error de parseo)
+Record = Tuple[int, Union[dict, str]]
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    lineno = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            lineno += 1
+            yield lineno, line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield lineno + 1, pending.rstrip("\r")
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    async for lineno, line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield lineno, f"JSON inválido: {e}"
+            continue
+        yield lineno, data if isinstance(data, dict) else "Se esperaba un objeto JSON"
+
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    header = None
+    record, start = "", 0
+    async for lineno, line in _iter_lines(chunks):
+        # Un campo entre comillas puede contener saltos de línea: se acumula hasta cerrarlas.
+        record, start = (record + "\n" + line, start) if record else (line, lineno)
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        data = dict(zip(header, values))
+        ids = data.get("category_ids") or ""
+        try:
+            data["category_ids"] = [int(v) for v in ids.replace(";", "|").split("|") if v.strip()]
+        except ValueError:
+            yield start, f"category_ids inválido: {ids!r}"
+            continue
+        if "is_active" in data:
+            data["is_active"] = data["is_active"].strip().lower() in ("1", "true", "yes", "si", "sí")
+        yield start, data
+    if record:
+        yield start, "Comillas sin cerrar al final del archivo"
+
+
+def _reject(result: WordImportResult, line: int, word, error: str) -> None:
+    result.rejected_total += 1
+    if len(result.rejected) < MAX_REPORTED_REJECTIONS:
+        result.rejected.append(WordImportRejected(line=line, word=word, error=error))
+
+
+async def _insert_batch(db: AsyncSession, batch: List[Tuple[int, WordCreate, List[int]]], result: WordImportResult) -> None:
+    # Por clave normalizada: "Ñaño" y "ñano" en el mismo lote son la misma palabra.
+    first_by_key = {}
+    for line, item, category_ids in batch:
+        key = fold(item.word)
+        if key in first_by_key:
+            _reject(result, line, item.word, f"Palabra repetida en el archivo (línea {first_by_key[key][0]})")
+        else:
+            first_by_key[key] = (line, item, category_ids)
+
+    # ON CONFLICT DO NOTHING: las palabras que ya existen no vuelven en RETURNING.
+    inserted = dict(
+        (
+            await db.execute(
+                pg_insert(models.Word)
+                .values([
+                    {"word": item.word, "word_key": key, "meaning": item.meaning, "is_active": item.is_active}
+                    for key, (_, item, _) in first_by_key.items()
+                ])
+                .on_conflict_do_nothing(index_elements=[models.Word.word_key])
+                .returning(models.Word.word_key, models.Word.id)
+            )
+        ).all()
+    )
+    links = []
+    for key, (line, item, category_ids) in first_by_key.items():
+        if key not in inserted:
+            _reject(result, line, item.word, "La palabra ya existe")
+            continue
+        links.extend({"word_id": inserted[key], "category_id": cid} for cid in category_ids)
+    if links:
+        await db.execute(pg_insert(models.word_category).values(links).on_conflict_do_nothing())
+    await db.commit()
+    result.inserted += len(inserted)
+    for key, (_, item, _) in first_by_key.items():
+        if key in inserted:
+            word_suggestions.add(inserted[key], item.word)
+
+
+async def import_words(db: AsyncSession, records: AsyncIterator[Record]) -> WordImportResult:
+    result = WordImportResult()
+    known_categories = set((await db.scalars(select(models.Category.id))).all())
+    max_word_length = models.Word.word.type.length
+    batch = []
+    async for line, data in records:
+        result.received += 1
+        if isinstance(data, str):
+            _reject(result, line, None, data)
+            continue
+        try:
+            item = WordCreate.model_validate(data)
+        except ValidationError as e:
+            err = e.errors()[0]
+            _reject(result, line, data.get("word"), f"{'.'.join(map(str, err['loc']))}: {err['msg']}")
+            continue
+        if len(item.word) > max_word_length:
+            _reject(result, line, item.word, f"word supera {max_word_length} caracteres")
+            continue
+        category_ids = [cid for cid in dict.fromkeys(item.category_ids) if cid in known_categories]
+        if not category_ids:
+            _reject(result, line, item.word, "No se encontraron categorías con esos IDs")
+            continue
+        batch.append((line, item, category_ids))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await _insert_batch(db, batch, result)
+            batch = []
+    if batch:
+        await _insert_batch(db, batch, result)
+    return result